@@ -1,15 +1,54 @@
 import json
 import os
-from typing import Dict
+from typing import Dict, Tuple
+from config.config_schema import CameraProfile, ConfigError, parse_camera_profile
 
 
 class ConfigLoader:
     @staticmethod
     def load_config(config_file: str = "config/lpr_config.json") -> Dict:
         default_config = {
+            "active_camera": None,
+            "cameras": {},
             "camera_source": 0,
+            "capture": {
+                "width": 1920,
+                "height": 1080,
+                "backend": "auto",
+                "gstreamer_pipeline": None,
+                "decode_threads": 0,
+                "hw_acceleration": True,
+                "rtsp_transport": "tcp",
+                "detection_scale": 0.5,
+                "drop_frames": True
+            },
+            "detector_model": "yolov8n.pt",
+            "detector_export_format": None,
+            "detector_backend": "ultralytics",
+            "detector_input_size": 640,
+            "detector_threads": 0,
+            "detector_quantize": False,
+            "model_cache_dir": "models",
+            "ocr_model_dir": None,
+            "ocr_pool": {
+                "enabled": False,
+                "workers": 2,
+                "threads_per_worker": 1,
+                "cpu_affinity": None,
+                "max_jobs_per_worker": 500,
+                "max_rss_mb": 1500.0,
+                "timeout_seconds": 5.0,
+                "max_restart_failures": 5
+            },
             "detection_confidence": 0.5,
             "ocr_confidence": 0.6,
+            "ocr_cache": {
+                "enabled": True,
+                "max_entries": 256,
+                "ttl_seconds": 30.0,
+                "max_distance": 8,
+                "hash_size": 16
+            },
             "gate_position": {"x": 640, "y": 400},
             "parking_zones": [
                 {"name": "parking_left", "points": [[50, 300], [300, 300], [300, 500], [50, 500]]},
@@ -19,19 +58,38 @@ class ConfigLoader:
                 {"name": "gate_1", "points": [[400, 200], [800, 200], [800, 600], [400, 600]]},
                 {"name": "detection_2", "points": [[500, 300], [700, 300], [700, 400], [500, 400]]}
             ],
+            "zone_roles": {"gate": "gate_1", "ocr": "detection_2"},
+            "detection_stride": 1,
+            "ocr_sample_interval": 10,
+            "config_reload_interval": 2.0,
             "min_stationary_time": 3.0,
             "max_wait_time": 180.0,
+            "display": True,
+            "debug_roi_windows": False,
+            "recording": {
+                "mode": "event",
+                "output_dir": "recordings",
+                "fps": 25.0,
+                "pre_event_seconds": 3.0,
+                "post_event_seconds": 5.0,
+                "pre_event_quality": 80,
+                "pre_event_fps": 5.0,
+                "codec": "mp4v"
+            },
             "mongodb": {
                 "connection_string": "mongodb://localhost:27017/",
                 "database_name": "lpr_system",
                 "vehicle_events_collection": "vehicle_events",
-                "openalpr_results_collection": "openalpr_results"
+                "openalpr_results_collection": "openalpr_results",
+                "parking_events_collection": "parking_events"
             }
         }
 
         try:
             with open(config_file, 'r') as f:
                 config = json.load(f)
+                if not isinstance(config, dict):
+                    raise ConfigError(f"{config_file} must contain a JSON object")
                 for key, value in default_config.items():
                     if key not in config:
                         config[key] = value
@@ -39,4 +97,29 @@ class ConfigLoader:
         except FileNotFoundError:
             with open(config_file, 'w') as f:
                 json.dump(default_config, f, indent=4)
-            return default_config
\ No newline at end of file
+            return default_config
+
+    @staticmethod
+    def resolve_camera(config: Dict, camera: str = None) -> Dict:
+        camera = camera or config.get('active_camera')
+        if not camera:
+            return config
+
+        cameras = config.get('cameras', {})
+        if not isinstance(cameras, dict):
+            raise ConfigError("'cameras' must be an object mapping camera names to profiles")
+        if camera not in cameras:
+            raise ConfigError(f"Unknown camera profile '{camera}'")
+        if not isinstance(cameras[camera], dict):
+            raise ConfigError(f"Camera profile '{camera}' must be an object, got {cameras[camera]!r}")
+
+        resolved = {key: value for key, value in config.items() if key != 'cameras'}
+        resolved.update(cameras[camera])
+        resolved['active_camera'] = camera
+        return resolved
+
+    @staticmethod
+    def load_profile(config_file: str = "config/lpr_config.json",
+                     camera: str = None) -> Tuple[Dict, CameraProfile]:
+        config = ConfigLoader.resolve_camera(ConfigLoader.load_config(config_file), camera)
+        return config, parse_camera_profile(config)
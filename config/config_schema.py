@@ -0,0 +1,110 @@
+import json
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+# settings a hot reload applies in place; any other change only takes effect after a restart
+HOT_RELOAD_KEYS = frozenset({
+    'parking_zones', 'detection_zones', 'zone_roles', 'detection_confidence', 'ocr_confidence',
+    'detection_stride', 'ocr_sample_interval'
+})
+
+
+class ConfigError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class ZoneConfig:
+    name: str
+    points: Tuple[Tuple[int, int], ...]
+
+
+@dataclass(frozen=True)
+class CameraProfile:
+    name: str
+    camera_source: object
+    parking_zones: Tuple[ZoneConfig, ...]
+    detection_zones: Tuple[ZoneConfig, ...]
+    gate_zone: str
+    ocr_zone: str
+    detection_confidence: float
+    ocr_confidence: float
+    detection_stride: int
+    ocr_sample_interval: int
+    # (key, JSON value) for every setting outside HOT_RELOAD_KEYS, compared on hot reload
+    restart_settings: Tuple[Tuple[str, str], ...] = ()
+
+    def restart_changes(self, other: 'CameraProfile') -> List[str]:
+        mine, theirs = dict(self.restart_settings), dict(other.restart_settings)
+        return sorted(key for key in mine.keys() | theirs.keys() if mine.get(key) != theirs.get(key))
+
+
+def _parse_zones(key: str, zone_configs: List[dict]) -> Tuple[ZoneConfig, ...]:
+    if not isinstance(zone_configs, list):
+        raise ConfigError(f"'{key}' must be a list of zones")
+
+    zones = []
+    names = set()
+    for zc in zone_configs:
+        name = zc.get('name') if isinstance(zc, dict) else None
+        if not name or not isinstance(name, str):
+            raise ConfigError(f"Zone in '{key}' is missing a name")
+        if name in names:
+            raise ConfigError(f"Duplicate zone name '{name}' in '{key}'")
+
+        points = zc.get('points')
+        if (not isinstance(points, list) or len(points) < 3 or
+                not all(isinstance(p, (list, tuple)) and len(p) == 2 and
+                        all(isinstance(v, (int, float)) for v in p) for p in points)):
+            raise ConfigError(f"Zone '{name}' needs at least 3 [x, y] points")
+
+        names.add(name)
+        zones.append(ZoneConfig(name, tuple((int(x), int(y)) for x, y in points)))
+    return tuple(zones)
+
+
+def _parse_fraction(config: dict, key: str) -> float:
+    value = config.get(key)
+    if not isinstance(value, (int, float)) or isinstance(value, bool) or not 0.0 < value <= 1.0:
+        raise ConfigError(f"'{key}' must be a number in (0, 1], got {value!r}")
+    return float(value)
+
+
+def _parse_positive_int(config: dict, key: str, default: int) -> int:
+    value = config.get(key, default)
+    if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+        raise ConfigError(f"'{key}' must be a positive integer, got {value!r}")
+    return value
+
+
+def parse_camera_profile(config: Dict) -> CameraProfile:
+    parking_zones = _parse_zones('parking_zones', config.get('parking_zones', []))
+    detection_zones = _parse_zones('detection_zones', config.get('detection_zones', []))
+
+    roles = config.get('zone_roles', {})
+    if not isinstance(roles, dict):
+        raise ConfigError(f"'zone_roles' must be an object mapping roles to zone names, got {roles!r}")
+    gate_zone = roles.get('gate', 'gate_1')
+    ocr_zone = roles.get('ocr', 'detection_2')
+    detection_names = {zone.name for zone in detection_zones}
+    for role, zone_name in (('gate', gate_zone), ('ocr', ocr_zone)):
+        if not isinstance(zone_name, str) or zone_name not in detection_names:
+            raise ConfigError(f"Zone role '{role}' refers to unknown detection zone '{zone_name}'")
+
+    if 'camera_source' not in config:
+        raise ConfigError("'camera_source' is missing")
+
+    return CameraProfile(
+        name=config.get('active_camera') or 'default',
+        camera_source=config['camera_source'],
+        parking_zones=parking_zones,
+        detection_zones=detection_zones,
+        gate_zone=gate_zone,
+        ocr_zone=ocr_zone,
+        detection_confidence=_parse_fraction(config, 'detection_confidence'),
+        ocr_confidence=_parse_fraction(config, 'ocr_confidence'),
+        detection_stride=_parse_positive_int(config, 'detection_stride', 1),
+        ocr_sample_interval=_parse_positive_int(config, 'ocr_sample_interval', 10),
+        restart_settings=tuple(sorted((key, json.dumps(value, sort_keys=True, default=str))
+                                      for key, value in config.items() if key not in HOT_RELOAD_KEYS))
+    )
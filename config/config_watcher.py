@@ -0,0 +1,63 @@
+import os
+import threading
+from typing import Callable
+from config.config_loader import ConfigLoader
+from config.config_schema import CameraProfile, ConfigError
+from utils.logger import get_logger
+
+
+class ConfigWatcher:
+    def __init__(self, config_file: str, camera: str, on_reload: Callable[[CameraProfile], None],
+                 interval: float = 2.0):
+        self.logger = get_logger(__name__)
+        self.config_file = config_file
+        self.camera = camera
+        self.on_reload = on_reload
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.last_mtime = self._mtime()
+        self.thread = None
+
+    def _mtime(self) -> float:
+        try:
+            return os.stat(self.config_file).st_mtime
+        except FileNotFoundError:
+            return 0.0
+
+    def start(self):
+        self.thread = threading.Thread(target=self._watch_worker, name="ConfigWatcher", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=self.interval + 1.0)
+            self.thread = None
+
+    def _watch_worker(self):
+        while not self.stop_event.wait(self.interval):
+            mtime = self._mtime()
+            if mtime == 0.0 or mtime == self.last_mtime:
+                continue
+            self.last_mtime = mtime
+            try:
+                self.reload()
+            except Exception as e:
+                # an unexpected config shape must not stop hot reload for good
+                self.logger.error(f"Unexpected error reloading {self.config_file}: {e}", exc_info=True)
+
+    def reload(self) -> bool:
+        try:
+            _, profile = ConfigLoader.load_profile(self.config_file, self.camera)
+        except (ConfigError, ValueError, KeyError) as e:
+            self.logger.error(f"Rejected config change in {self.config_file}: {e}")
+            return False
+
+        try:
+            self.on_reload(profile)
+        except Exception as e:
+            self.logger.error(f"Failed to apply reloaded config: {e}", exc_info=True)
+            return False
+
+        self.logger.info(f"Applied config change from {self.config_file}")
+        return True
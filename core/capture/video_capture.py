@@ -0,0 +1,211 @@
+import os
+import threading
+from typing import Optional, Tuple, Union
+import cv2
+import numpy as np
+from utils.frame_pool import FramePool, FrameBuffer
+from utils.logger import get_logger
+
+
+class ThreadedVideoCapture:
+    def __init__(self, source: Union[int, str], width: int = 1920, height: int = 1080,
+                 backend: str = "auto", gstreamer_pipeline: str = None, decode_threads: int = 0,
+                 hw_acceleration: bool = True, rtsp_transport: str = "tcp",
+                 detection_scale: float = 1.0, drop_frames: bool = True, extra_buffers: int = 0):
+        self.logger = get_logger(__name__)
+        self.source = source
+        self.width = width
+        self.height = height
+        self.backend = backend
+        self.gstreamer_pipeline = gstreamer_pipeline
+        self.decode_threads = decode_threads
+        self.hw_acceleration = hw_acceleration
+        self.rtsp_transport = rtsp_transport
+        self.detection_scale = detection_scale
+        self.detection_size = (int(width * detection_scale), int(height * detection_scale))
+        self.drop_frames = drop_frames
+        # one slot being decoded, one waiting as latest, one held by the consumer
+        self.pool_slots = 3 + extra_buffers
+
+        self.frame_pool = None
+        self.detection_pool = None
+        self.cap = None
+        self.thread = None
+        self.running = False
+        self.ended = False
+        self.condition = threading.Condition()
+        self.latest = None
+        self.frame_id = 0
+        self.dropped_frames = 0
+
+    @classmethod
+    def from_config(cls, config: dict, extra_buffers: int = 0) -> 'ThreadedVideoCapture':
+        capture = config.get('capture', {})
+        return cls(
+            source=config['camera_source'],
+            width=capture.get('width', 1920),
+            height=capture.get('height', 1080),
+            backend=capture.get('backend', 'auto'),
+            gstreamer_pipeline=capture.get('gstreamer_pipeline'),
+            decode_threads=capture.get('decode_threads', 0),
+            hw_acceleration=capture.get('hw_acceleration', True),
+            rtsp_transport=capture.get('rtsp_transport', 'tcp'),
+            detection_scale=capture.get('detection_scale', 1.0),
+            drop_frames=capture.get('drop_frames', True),
+            extra_buffers=extra_buffers
+        )
+
+    def _is_stream(self) -> bool:
+        return isinstance(self.source, str) and self.source.lower().startswith(('rtsp://', 'rtsps://', 'http://', 'https://'))
+
+    def _open_params(self) -> list:
+        params = []
+        if self.hw_acceleration and hasattr(cv2, 'CAP_PROP_HW_ACCELERATION'):
+            params += [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY]
+        if self.decode_threads > 0 and hasattr(cv2, 'CAP_PROP_N_THREADS'):
+            params += [cv2.CAP_PROP_N_THREADS, self.decode_threads]
+        return params
+
+    def _create_capture(self) -> cv2.VideoCapture:
+        if self.backend == "gstreamer" or self.gstreamer_pipeline:
+            pipeline = self.gstreamer_pipeline or (
+                f"rtspsrc location={self.source} latency=0 protocols={self.rtsp_transport} ! "
+                f"decodebin ! videoconvert ! video/x-raw,format=BGR ! "
+                f"appsink drop=true max-buffers=1 sync=false")
+            return cv2.VideoCapture(pipeline, cv2.CAP_GSTREAMER)
+
+        api = cv2.CAP_ANY
+        if self.backend == "ffmpeg" or self._is_stream():
+            api = cv2.CAP_FFMPEG
+            if self._is_stream() and 'OPENCV_FFMPEG_CAPTURE_OPTIONS' not in os.environ:
+                os.environ['OPENCV_FFMPEG_CAPTURE_OPTIONS'] = f"rtsp_transport;{self.rtsp_transport}"
+
+        params = self._open_params()
+        if params:
+            cap = cv2.VideoCapture(self.source, api, params)
+        else:
+            cap = cv2.VideoCapture(self.source, api)
+
+        if not self._is_stream():
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        return cap
+
+    def open(self) -> bool:
+        self.cap = self._create_capture()
+        if not self.cap.isOpened():
+            return False
+
+        # only this process reads captured frames, so the pools stay out of /dev/shm
+        self.frame_pool = FramePool((self.height, self.width, 3), self.pool_slots, shared=False)
+        if self.detection_scale != 1.0:
+            w, h = self.detection_size
+            self.detection_pool = FramePool((h, w, 3), 3, shared=False)
+
+        self.running = True
+        self.ended = False
+        self.thread = threading.Thread(target=self._capture_worker, name="VideoCapture", daemon=True)
+        self.thread.start()
+        self.logger.info(f"Capture started: {self.source} "
+                         f"({self.cap.get(cv2.CAP_PROP_FRAME_WIDTH):.0f}x{self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT):.0f}, "
+                         f"backend {self.cap.getBackendName()})")
+        return True
+
+    def _decode_into(self, frame_buf: FrameBuffer) -> bool:
+        target = frame_buf.array
+        ret, frame = self.cap.read(target)
+        if not ret:
+            return False
+
+        if frame is not target:
+            if frame.shape == target.shape:
+                np.copyto(target, frame)
+            else:
+                cv2.resize(frame, (self.width, self.height), dst=target)
+        return True
+
+    def _acquire_buffers(self) -> Tuple[Optional[FrameBuffer], Optional[FrameBuffer]]:
+        frame_buf = self.frame_pool.acquire()
+        if frame_buf is None:
+            return None, None
+        if self.detection_pool is None:
+            return frame_buf, frame_buf.retain()
+
+        detection_buf = self.detection_pool.acquire()
+        if detection_buf is None:
+            frame_buf.release()
+            return None, None
+        return frame_buf, detection_buf
+
+    def _capture_worker(self):
+        try:
+            while self.running:
+                frame_buf, detection_buf = self._acquire_buffers()
+                if frame_buf is None:
+                    # every slot is still referenced downstream; keep the stream moving
+                    self.dropped_frames += 1
+                    if not self.cap.grab():
+                        self.logger.warning("Capture stream ended")
+                        break
+                    continue
+
+                if not self._decode_into(frame_buf):
+                    frame_buf.release()
+                    detection_buf.release()
+                    self.logger.warning("Capture stream ended")
+                    break
+
+                if detection_buf is not frame_buf:
+                    cv2.resize(frame_buf.array, self.detection_size, dst=detection_buf.array,
+                               interpolation=cv2.INTER_AREA)
+
+                with self.condition:
+                    if not self.drop_frames:
+                        self.condition.wait_for(lambda: self.latest is None or not self.running)
+                    if self.latest is not None:
+                        self.dropped_frames += 1
+                        for buf in self.latest:
+                            buf.release()
+                    self.latest = (frame_buf, detection_buf)
+                    self.frame_id += 1
+                    self.condition.notify_all()
+        except Exception as e:
+            self.logger.error(f"Capture error: {e}", exc_info=True)
+        finally:
+            with self.condition:
+                self.ended = True
+                self.condition.notify_all()
+
+    def read(self, timeout: float = 5.0) -> Tuple[bool, Optional[FrameBuffer], Optional[FrameBuffer]]:
+        # the caller owns one reference to each returned buffer and must release both
+        with self.condition:
+            self.condition.wait_for(lambda: self.latest is not None or self.ended, timeout)
+            if self.latest is None:
+                return False, None, None
+
+            frame_buf, detection_buf = self.latest
+            self.latest = None
+            self.condition.notify_all()
+            return True, frame_buf, detection_buf
+
+    def release(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout=5.0)
+            self.thread = None
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+        with self.condition:
+            if self.latest is not None:
+                for buf in self.latest:
+                    buf.release()
+                self.latest = None
+        for pool in (self.frame_pool, self.detection_pool):
+            if pool is not None:
+                pool.close()
+        if self.dropped_frames:
+            self.logger.info(f"Capture dropped {self.dropped_frames} stale frames")
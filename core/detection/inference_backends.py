@@ -0,0 +1,321 @@
+import os
+import threading
+from abc import ABC, abstractmethod
+import cv2
+import numpy as np
+from typing import Iterable, List, Optional, Tuple
+from utils.logger import get_logger
+
+# x1, y1, x2, y2, confidence, class_id in input frame coordinates
+Prediction = Tuple[float, float, float, float, float, int]
+
+
+def export_onnx(model_path: str, output_path: str, imgsz: int = 640) -> str:
+    from ultralytics import YOLO
+
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    exported = YOLO(model_path).export(format='onnx', imgsz=imgsz, dynamic=False, simplify=True, verbose=False)
+    os.replace(exported, output_path)
+    return output_path
+
+
+def quantize_int8(onnx_path: str, output_path: str) -> str:
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(onnx_path, output_path, weight_type=QuantType.QUInt8)
+    return output_path
+
+
+def letterbox(frame: np.ndarray, size: int) -> Tuple[np.ndarray, float, float, float]:
+    h, w = frame.shape[:2]
+    ratio = min(size / h, size / w)
+    new_w, new_h = int(round(w * ratio)), int(round(h * ratio))
+    pad_x, pad_y = (size - new_w) / 2, (size - new_h) / 2
+
+    if (new_w, new_h) != (w, h):
+        frame = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    top, bottom = int(round(pad_y - 0.1)), int(round(pad_y + 0.1))
+    left, right = int(round(pad_x - 0.1)), int(round(pad_x + 0.1))
+    padded = cv2.copyMakeBorder(frame, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(114, 114, 114))
+
+    blob = cv2.dnn.blobFromImage(padded, 1 / 255.0, swapRB=True)
+    return blob, ratio, left, top
+
+
+def decode_yolov8(output: np.ndarray, ratio: float, pad_x: float, pad_y: float, conf: float,
+                  iou_threshold: float, classes: Optional[Iterable[int]] = None) -> List[Prediction]:
+    preds = output[0].T
+    scores = preds[:, 4:]
+    class_ids = scores.argmax(axis=1)
+    confidences = scores[np.arange(len(scores)), class_ids]
+
+    keep = confidences >= conf
+    if classes is not None:
+        keep &= np.isin(class_ids, list(classes))
+    if not keep.any():
+        return []
+
+    boxes = preds[keep, :4]
+    confidences = confidences[keep]
+    class_ids = class_ids[keep]
+
+    x1 = (boxes[:, 0] - boxes[:, 2] / 2 - pad_x) / ratio
+    y1 = (boxes[:, 1] - boxes[:, 3] / 2 - pad_y) / ratio
+    w = boxes[:, 2] / ratio
+    h = boxes[:, 3] / ratio
+
+    # offset boxes per class so a single NMS pass stays class-aware, like ultralytics
+    offset = class_ids * 4096.0
+    nms_boxes = np.stack([x1 + offset, y1 + offset, w, h], axis=1)
+    indices = cv2.dnn.NMSBoxes(nms_boxes.tolist(), confidences.tolist(), conf, iou_threshold)
+
+    return [(float(x1[i]), float(y1[i]), float(x1[i] + w[i]), float(y1[i] + h[i]),
+             float(confidences[i]), int(class_ids[i])) for i in np.array(indices).flatten()]
+
+
+class InferenceBackend(ABC):
+    name = "base"
+
+    @abstractmethod
+    def load(self):
+        pass
+
+    @abstractmethod
+    def predict(self, frame: np.ndarray, conf: float,
+                classes: Optional[Iterable[int]] = None) -> List[Prediction]:
+        pass
+
+
+class UltralyticsBackend(InferenceBackend):
+    name = "ultralytics"
+
+    def __init__(self, model_path: str, export_format: str = None, model_cache_dir: str = "models"):
+        self.logger = get_logger(__name__)
+        self.model_path = model_path
+        self.export_format = export_format
+        self.model_cache_dir = model_cache_dir
+        self.model = None
+        self.export_thread = None
+
+    def _exported_path(self) -> str:
+        name = os.path.splitext(os.path.basename(self.model_path))[0]
+        return os.path.join(self.model_cache_dir, f"{name}.{self.export_format}")
+
+    def load(self):
+        from ultralytics import YOLO
+
+        exported_path = self._exported_path() if self.export_format else None
+        if exported_path and os.path.exists(exported_path):
+            self.logger.info(f"Loading cached {self.export_format} model: {exported_path}")
+            model = YOLO(exported_path, task='detect')
+        else:
+            model = YOLO(self.model_path)
+
+        model(np.zeros((640, 640, 3), dtype=np.uint8), verbose=False)
+        self.model = model
+
+        if exported_path and not os.path.exists(exported_path):
+            # the export takes minutes on first boot; detection runs on the pt model meanwhile
+            self.export_thread = threading.Thread(target=self._export, args=(exported_path,),
+                                                  name="ModelExport", daemon=True)
+            self.export_thread.start()
+
+    def _export(self, exported_path: str):
+        from ultralytics import YOLO
+
+        try:
+            os.makedirs(self.model_cache_dir, exist_ok=True)
+            exported = YOLO(self.model_path).export(format=self.export_format, verbose=False)
+            os.replace(exported, exported_path)
+            self.logger.info(f"Exported {self.export_format} model to {exported_path}, used from next start")
+        except Exception as e:
+            self.logger.warning(f"Model export to {self.export_format} failed: {e}")
+
+    def predict(self, frame: np.ndarray, conf: float,
+                classes: Optional[Iterable[int]] = None) -> List[Prediction]:
+        predictions = []
+        results = self.model(frame, conf=conf, classes=list(classes) if classes is not None else None,
+                             verbose=False)
+
+        for result in results:
+            boxes = result.boxes
+            if boxes is None:
+                continue
+            for xyxy, box_conf, cls in zip(boxes.xyxy.cpu().numpy(), boxes.conf.cpu().numpy(),
+                                           boxes.cls.cpu().numpy()):
+                x1, y1, x2, y2 = xyxy
+                predictions.append((float(x1), float(y1), float(x2), float(y2), float(box_conf), int(cls)))
+
+        return predictions
+
+
+class OnnxRuntimeBackend(InferenceBackend):
+    name = "onnxruntime"
+
+    def __init__(self, model_path: str, model_cache_dir: str = "models", input_size: int = 640,
+                 intra_op_threads: int = 0, quantize: bool = False, iou_threshold: float = 0.7):
+        self.logger = get_logger(__name__)
+        self.model_path = model_path
+        self.model_cache_dir = model_cache_dir
+        self.input_size = input_size
+        self.intra_op_threads = intra_op_threads
+        self.quantize = quantize
+        self.iou_threshold = iou_threshold
+        self.session = None
+        self.input_name = None
+
+    def _onnx_path(self) -> str:
+        if self.model_path.endswith('.onnx'):
+            return self.model_path
+
+        name = os.path.splitext(os.path.basename(self.model_path))[0]
+        onnx_path = os.path.join(self.model_cache_dir, f"{name}_{self.input_size}.onnx")
+        if not os.path.exists(onnx_path):
+            self.logger.info(f"Exporting {self.model_path} to {onnx_path}")
+            export_onnx(self.model_path, onnx_path, imgsz=self.input_size)
+        return onnx_path
+
+    def _model_file(self) -> str:
+        onnx_path = self._onnx_path()
+        if not self.quantize:
+            return onnx_path
+
+        quantized_path = onnx_path.replace('.onnx', '_int8.onnx')
+        if not os.path.exists(quantized_path):
+            self.logger.info(f"Quantizing {onnx_path} to int8")
+            quantize_int8(onnx_path, quantized_path)
+        return quantized_path
+
+    def load(self):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.inter_op_num_threads = 1
+        if self.intra_op_threads > 0:
+            options.intra_op_num_threads = self.intra_op_threads
+
+        model_file = self._model_file()
+        self.session = ort.InferenceSession(model_file, sess_options=options, providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+        self.predict(np.zeros((self.input_size, self.input_size, 3), dtype=np.uint8), 0.5)
+        self.logger.info(f"ONNX Runtime backend loaded: {model_file}")
+
+    def _infer(self, blob: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self.input_name: blob})[0]
+
+    def predict(self, frame: np.ndarray, conf: float,
+                classes: Optional[Iterable[int]] = None) -> List[Prediction]:
+        blob, ratio, pad_x, pad_y = letterbox(frame, self.input_size)
+        output = self._infer(blob)
+        return decode_yolov8(output, ratio, pad_x, pad_y, conf, self.iou_threshold, classes)
+
+
+class OpenVINOBackend(OnnxRuntimeBackend):
+    name = "openvino"
+
+    def __init__(self, model_path: str, model_cache_dir: str = "models", input_size: int = 640,
+                 intra_op_threads: int = 0, quantize: bool = False, iou_threshold: float = 0.7):
+        super().__init__(model_path, model_cache_dir=model_cache_dir, input_size=input_size,
+                         intra_op_threads=intra_op_threads, quantize=False, iou_threshold=iou_threshold)
+        if quantize:
+            self.logger.warning("detector_quantize is not supported by the OpenVINO backend, using the fp32 model")
+        self.compiled_model = None
+
+    def load(self):
+        import openvino as ov
+
+        config = {'PERFORMANCE_HINT': 'LATENCY'}
+        if self.intra_op_threads > 0:
+            config['INFERENCE_NUM_THREADS'] = self.intra_op_threads
+
+        model_file = self._onnx_path()
+        self.compiled_model = ov.Core().compile_model(model_file, 'CPU', config)
+        self.predict(np.zeros((self.input_size, self.input_size, 3), dtype=np.uint8), 0.5)
+        self.logger.info(f"OpenVINO backend loaded: {model_file}")
+
+    def _infer(self, blob: np.ndarray) -> np.ndarray:
+        return self.compiled_model(blob)[0]
+
+
+def create_backend(name: str, model_path: str, model_cache_dir: str = "models", input_size: int = 640,
+                   intra_op_threads: int = 0, quantize: bool = False,
+                   export_format: str = None) -> InferenceBackend:
+    if name == "ultralytics":
+        return UltralyticsBackend(model_path, export_format=export_format, model_cache_dir=model_cache_dir)
+    if name == "onnxruntime":
+        return OnnxRuntimeBackend(model_path, model_cache_dir=model_cache_dir, input_size=input_size,
+                                  intra_op_threads=intra_op_threads, quantize=quantize)
+    if name == "openvino":
+        return OpenVINOBackend(model_path, model_cache_dir=model_cache_dir, input_size=input_size,
+                               intra_op_threads=intra_op_threads, quantize=quantize)
+    raise ValueError(f"Unknown inference backend: {name}")
+
+
+def _iou(a: Prediction, b: Prediction) -> float:
+    ix1, iy1 = max(a[0], b[0]), max(a[1], b[1])
+    ix2, iy2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0.0, ix2 - ix1) * max(0.0, iy2 - iy1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def check_parity(reference: InferenceBackend, candidate: InferenceBackend, frames: Iterable[np.ndarray],
+                 conf: float = 0.5, classes: Optional[Iterable[int]] = None,
+                 min_iou: float = 0.9, max_conf_delta: float = 0.05) -> dict:
+    matched = missing = extra = 0
+    worst_iou = 1.0
+    worst_conf_delta = 0.0
+
+    for frame in frames:
+        expected = reference.predict(frame, conf, classes)
+        actual = list(candidate.predict(frame, conf, classes))
+
+        for exp in expected:
+            same_class = [p for p in actual if p[5] == exp[5]]
+            best = max(same_class, key=lambda p: _iou(exp, p), default=None)
+            if best is None or _iou(exp, best) < min_iou:
+                missing += 1
+                continue
+            matched += 1
+            worst_iou = min(worst_iou, _iou(exp, best))
+            worst_conf_delta = max(worst_conf_delta, abs(exp[4] - best[4]))
+            actual.remove(best)
+        extra += len(actual)
+
+    return {
+        'matched': matched,
+        'missing': missing,
+        'extra': extra,
+        'worst_iou': worst_iou,
+        'worst_conf_delta': worst_conf_delta,
+        'passed': missing == 0 and extra == 0 and worst_conf_delta <= max_conf_delta
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare an inference backend against the PyTorch path")
+    parser.add_argument('video', help="video file to sample frames from")
+    parser.add_argument('--backend', default='onnxruntime', choices=['onnxruntime', 'openvino'])
+    parser.add_argument('--model', default='yolov8n.pt')
+    parser.add_argument('--frames', type=int, default=50)
+    parser.add_argument('--quantize', action='store_true')
+    args = parser.parse_args()
+
+    cap = cv2.VideoCapture(args.video)
+    sample = []
+    while len(sample) < args.frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        sample.append(frame)
+    cap.release()
+
+    reference_backend = create_backend('ultralytics', args.model)
+    candidate_backend = create_backend(args.backend, args.model, quantize=args.quantize)
+    reference_backend.load()
+    candidate_backend.load()
+    print(check_parity(reference_backend, candidate_backend, sample, classes=[2, 3, 5, 7]))
@@ -1,33 +1,56 @@
 import cv2
 import numpy as np
-from ultralytics import YOLO
 from typing import List, Tuple
+from core.detection.inference_backends import create_backend
 from utils.logger import get_logger
 
 class VehicleDetector:
-    def __init__(self, model_path: str = 'yolov8n.pt', confidence: float = 0.5):
+    def __init__(self, model_path: str = 'yolov8n.pt', confidence: float = 0.5, backend: str = "ultralytics",
+                 export_format: str = None, model_cache_dir: str = "models", input_size: int = 640,
+                 intra_op_threads: int = 0, quantize: bool = False):
         self.logger = get_logger(__name__)
-        self.model = YOLO(model_path)
+        self.model_path = model_path
+        self.model_cache_dir = model_cache_dir
+        self.export_format = export_format
+        self.backend = create_backend(backend, model_path, model_cache_dir=model_cache_dir, input_size=input_size,
+                                      intra_op_threads=intra_op_threads, quantize=quantize,
+                                      export_format=export_format)
         self.confidence = confidence
         self.vehicle_classes = [2, 3, 5, 7]  # car, motorcycle, bus, truck
+        self._masked_frame = None
+        self._masked_with = None
 
-    def detect(self, frame: np.ndarray, mask: np.ndarray = None) -> List[Tuple[int, int, int, int, float]]:
+    def load(self):
+        try:
+            self.backend.load()
+        except Exception as e:
+            if self.backend.name == "ultralytics":
+                raise
+            self.logger.warning(f"{self.backend.name} backend unavailable ({e}), falling back to ultralytics")
+            self.backend = create_backend("ultralytics", self.model_path, model_cache_dir=self.model_cache_dir,
+                                          export_format=self.export_format)
+            self.backend.load()
+        self.logger.info(f"Vehicle detector using {self.backend.name} backend")
+
+    def detect(self, frame: np.ndarray, mask: np.ndarray = None,
+               scale: float = 1.0) -> List[Tuple[int, int, int, int, float]]:
         vehicles = []
 
         detection_frame = frame
         if mask is not None:
-            detection_frame = cv2.bitwise_and(frame, frame, mask=mask)
+            # pixels outside the mask are never written, so the buffer only needs
+            # zeroing when the mask or frame size changes
+            if (self._masked_frame is None or self._masked_frame.shape != frame.shape
+                    or self._masked_with is not mask):
+                self._masked_frame = np.zeros_like(frame)
+                self._masked_with = mask
+            cv2.bitwise_and(frame, frame, dst=self._masked_frame, mask=mask)
+            detection_frame = self._masked_frame
 
-        results = self.model(detection_frame, conf=self.confidence, verbose=False)
+        predictions = self.backend.predict(detection_frame, self.confidence, classes=self.vehicle_classes)
 
-        for result in results:
-            boxes = result.boxes
-            if boxes is not None:
-                for box in boxes:
-                    class_id = int(box.cls[0])
-                    if class_id in self.vehicle_classes:
-                        x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-                        confidence = float(box.conf[0])
-                        vehicles.append((int(x1), int(y1), int(x2), int(y2), confidence))
+        for x1, y1, x2, y2, confidence, class_id in predictions:
+            if class_id in self.vehicle_classes:
+                vehicles.append((int(x1 / scale), int(y1 / scale), int(x2 / scale), int(y2 / scale), confidence))
 
         return vehicles
\ No newline at end of file
@@ -1,32 +1,42 @@
 import cv2
 import numpy as np
-from typing import List, Tuple
-from dataclasses import dataclass
+from typing import Dict, List, Tuple
+from dataclasses import dataclass, field
+from config.config_schema import CameraProfile, ZoneConfig
 
 
 @dataclass
 class DetectionZone:
     name: str
     polygon: List[Tuple[int, int]]
+    _mask_cache: Dict[Tuple, np.ndarray] = field(default_factory=dict, init=False, repr=False, compare=False)
 
     def contains_point(self, x: int, y: int) -> bool:
         return cv2.pointPolygonTest(np.array(self.polygon), (x, y), False) >= 0
 
-    def create_mask(self, frame_shape: Tuple[int, int]) -> np.ndarray:
-        mask = np.zeros(frame_shape[:2], dtype=np.uint8)
-        cv2.fillPoly(mask, [np.array(self.polygon, np.int32)], 255)
+    def create_mask(self, frame_shape: Tuple[int, int], scale: float = 1.0) -> np.ndarray:
+        key = (tuple(frame_shape[:2]), scale)
+        mask = self._mask_cache.get(key)
+        if mask is None:
+            mask = np.zeros(frame_shape[:2], dtype=np.uint8)
+            polygon = np.array(self.polygon, np.float32) * scale
+            cv2.fillPoly(mask, [polygon.round().astype(np.int32)], 255)
+            mask.flags.writeable = False
+            self._mask_cache[key] = mask
         return mask
 
 
 class ZoneManager:
-    def __init__(self, config: dict):
-        self.parking_zones = self._create_zones(config['parking_zones'])
-        self.detection_zones = self._create_zones(config['detection_zones'])
-        self.gate_zone = self._find_zone('gate_1')
-        self.ocr_zone = self._find_zone('detection_2')
+    def __init__(self, profile: CameraProfile):
+        self.profile = profile
+        self.parking_zones = self._create_zones(profile.parking_zones)
+        self.detection_zones = self._create_zones(profile.detection_zones)
+        self.gate_zone = self._find_zone(profile.gate_zone)
+        self.ocr_zone = self._find_zone(profile.ocr_zone)
+        self._detection_mask_cache: Dict[Tuple, np.ndarray] = {}
 
-    def _create_zones(self, zone_configs: List[dict]) -> List[DetectionZone]:
-        return [DetectionZone(zc['name'], zc['points']) for zc in zone_configs]
+    def _create_zones(self, zone_configs: Tuple[ZoneConfig, ...]) -> List[DetectionZone]:
+        return [DetectionZone(zc.name, [list(p) for p in zc.points]) for zc in zone_configs]
 
     def _find_zone(self, name: str) -> DetectionZone:
         for zone in self.detection_zones:
@@ -34,6 +44,18 @@ class ZoneManager:
                 return zone
         return None
 
+    def detection_mask(self, frame_shape: Tuple[int, int], scale: float = 1.0) -> np.ndarray:
+        # the detector must see the parking zones too, or stationary vehicles there are never tracked
+        key = (tuple(frame_shape[:2]), scale)
+        mask = self._detection_mask_cache.get(key)
+        if mask is None:
+            mask = self.gate_zone.create_mask(frame_shape, scale=scale).copy()
+            for zone in self.parking_zones:
+                cv2.bitwise_or(mask, zone.create_mask(frame_shape, scale=scale), dst=mask)
+            mask.flags.writeable = False
+            self._detection_mask_cache[key] = mask
+        return mask
+
     def draw_zones(self, frame: np.ndarray) -> np.ndarray:
         for zone in self.parking_zones:
             pts = np.array(zone.polygon, np.int32)
@@ -1,16 +1,31 @@
 import cv2
 import numpy as np
-import easyocr
 import random
+from concurrent.futures import Future
 from typing import List, Tuple, Optional
+from core.recognition.plate_cache import PlateRecognitionCache
 from utils.logger import get_logger
 
 
 class LicensePlateRecognizer:
-    def __init__(self, ocr_confidence: float = 0.6):
+    def __init__(self, ocr_confidence: float = 0.6, roi_sink=None, model_dir: str = None,
+                 cache: PlateRecognitionCache = None):
         self.logger = get_logger(__name__)
-        self.ocr_reader = easyocr.Reader(['en'])
+        self.ocr_reader = None
         self.ocr_confidence = ocr_confidence
+        self.roi_sink = roi_sink
+        self.model_dir = model_dir
+        self.cache = cache
+
+    def load(self):
+        import easyocr
+
+        kwargs = {}
+        if self.model_dir:
+            kwargs = {'model_storage_directory': self.model_dir, 'user_network_directory': self.model_dir}
+        reader = easyocr.Reader(['en'], **kwargs)
+        reader.readtext(np.zeros((32, 128), dtype=np.uint8))
+        self.ocr_reader = reader
 
     def is_valid_license_plate(self, text: str) -> bool:
         if not text:
@@ -46,35 +61,70 @@ class LicensePlateRecognizer:
             return None, 0.0
 
         try:
-            best_plate = None
-            best_confidence = 0.0
-
-            sample_size = min(3, len(roi_list))
-            sample_rois = random.sample(roi_list, sample_size)
+            valid_rois = self._sample_rois(roi_list, direction, track_id)
+            return self._select_best(self._recognize_rois(valid_rois, track_id), direction, track_id)
+        except Exception as e:
+            self.logger.error(f"OCR error: {e}")
 
-            for selected_roi in sample_rois:
-                cv2.imshow(f"License Plate ROI - Track {track_id} - Direction {direction}", selected_roi)
-                if selected_roi is None or selected_roi.size == 0:
-                    continue
+        return None, 0.0
 
-                plate, confidence = self._process_single_roi(selected_roi)
+    def submit_license_plate(self, roi_list: List[np.ndarray], direction: str,
+                             track_id: int = None) -> Future:
+        # in-process OCR runs on the caller's thread; the process pool overrides this to return at once
+        future = Future()
+        future.set_result(self.recognize_license_plate(roi_list, direction, track_id))
+        return future
+
+    def _sample_rois(self, roi_list: List[np.ndarray], direction: str, track_id: int) -> List[np.ndarray]:
+        sample_size = min(3, len(roi_list))
+        sample_rois = random.sample(roi_list, sample_size)
+
+        valid_rois = []
+        for selected_roi in sample_rois:
+            if selected_roi is None or selected_roi.size == 0:
+                continue
+            if self.roi_sink is not None:
+                self.roi_sink.show_roi(f"License Plate ROI - Track {track_id} - Direction {direction}", selected_roi)
+            valid_rois.append(selected_roi)
+        return valid_rois
+
+    def _select_best(self, results: List[Tuple[Optional[str], float]], direction: str,
+                     track_id: int) -> Tuple[Optional[str], float]:
+        best_plate = None
+        best_confidence = 0.0
+        for plate, confidence in results:
+            if plate and self.is_valid_license_plate(plate) and confidence > best_confidence:
+                best_plate = plate
+                best_confidence = confidence
+
+        if best_plate and best_confidence > self.ocr_confidence:
+            self.logger.info(f"Final recognized plate: {best_plate} with confidence {best_confidence}")
+            return best_plate.upper(), best_confidence
+
+        self.logger.warning(f"No valid license plate detected for track {track_id} in direction {direction}")
+        return None, 0.0
 
-                if plate and self.is_valid_license_plate(plate) and confidence > best_confidence:
-                    best_plate = plate
-                    best_confidence = confidence
+    def cancel_track(self, track_id: int):
+        pass
 
+    def close(self):
+        pass
 
+    def _recognize_rois(self, rois: List[np.ndarray], track_id: int = None) -> List[Tuple[Optional[str], float]]:
+        return [self._recognize_roi(roi, track_id) for roi in rois]
 
-            if best_plate and best_confidence > self.ocr_confidence:
-                self.logger.info(f"Final recognized plate: {best_plate} with confidence {best_confidence}")
-                return best_plate.upper(), best_confidence
-            else:
-                self.logger.warning(f"No valid license plate detected for track {track_id} in direction {direction}")
+    def _recognize_roi(self, roi: np.ndarray, track_id: int = None) -> Tuple[Optional[str], float]:
+        if self.cache is None:
+            return self._process_single_roi(roi)
 
-        except Exception as e:
-            self.logger.error(f"OCR error: {e}")
+        fingerprint = self.cache.fingerprint(roi)
+        cached = self.cache.get(track_id, fingerprint)
+        if cached is not None:
+            return cached
 
-        return None, 0.0
+        plate, confidence = self._process_single_roi(roi)
+        self.cache.put(track_id, fingerprint, plate, confidence)
+        return plate, confidence
 
     def _process_single_roi(self, roi: np.ndarray) -> Tuple[Optional[str], float]:
         try:
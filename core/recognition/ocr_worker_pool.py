@@ -0,0 +1,410 @@
+import itertools
+import multiprocessing
+import multiprocessing.connection
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, InvalidStateError
+from functools import partial
+from typing import List, Optional, Tuple
+import numpy as np
+from core.recognition.license_plate_recognizer import LicensePlateRecognizer
+from core.recognition.plate_cache import PlateRecognitionCache
+from utils.frame_pool import FramePool
+from utils.logger import get_logger
+
+
+def _ocr_worker_main(worker_id: int, task_conn, result_conn, slot_pool_name: str, slot_size: int,
+                     slot_count: int, threads: int, cpu_affinity: Optional[List[int]], model_dir: str,
+                     max_jobs: int, max_rss_mb: float):
+    # thread limits must be in place before torch is imported
+    for var in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+        os.environ[var] = str(threads)
+    if cpu_affinity and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, cpu_affinity)
+
+    import psutil
+    import torch
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(1)
+
+    logger = get_logger(__name__)
+    process = psutil.Process(os.getpid())
+    slots = FramePool.attach(slot_pool_name, (slot_size,), slot_count)
+    slot = slots.arrays[worker_id]
+
+    recognizer = LicensePlateRecognizer(model_dir=model_dir)
+    recognizer.load()
+    result_conn.send(('ready', None, None))
+
+    jobs_done = 0
+    try:
+        while True:
+            try:
+                task = task_conn.recv()
+            except EOFError:
+                break
+            if task is None:
+                break
+
+            job_id, shape = task
+            roi = slot[:int(np.prod(shape))].reshape(shape)
+            result = recognizer._process_single_roi(roi)
+            del roi
+            result_conn.send(('result', job_id, result))
+
+            jobs_done += 1
+            rss_mb = process.memory_info().rss / (1024 * 1024)
+            if jobs_done >= max_jobs or rss_mb > max_rss_mb:
+                logger.info(f"OCR worker {worker_id} recycling after {jobs_done} jobs ({rss_mb:.0f} MB RSS)")
+                result_conn.send(('recycle', None, None))
+                break
+    finally:
+        del slot
+        slots.close()
+        result_conn.close()
+
+
+class _OCRJob:
+    def __init__(self, job_id: int, track_id: int, roi: np.ndarray, deadline: float):
+        self.job_id = job_id
+        self.track_id = track_id
+        self.roi = roi
+        # the submit-time deadline only expires queued jobs; dispatch sets the run deadline
+        self.deadline = deadline
+        self.run_deadline = None
+        self.future = Future()
+
+
+class _OCRRequest:
+    # gathers the per-ROI jobs of one recognize call into a single future
+    def __init__(self, direction: str, track_id: int, size: int):
+        self.direction = direction
+        self.track_id = track_id
+        self.results = [(None, 0.0)] * size
+        self.remaining = 0
+        self.future = Future()
+
+
+class _OCRWorker:
+    # one per slot; outlives the processes it runs so restart failures can be counted
+    def __init__(self):
+        self.process = None
+        self.task_conn = None
+        self.result_conn = None
+        self.ready = False
+        self.recycling = False
+        self.job: Optional[_OCRJob] = None
+        self.failures = 0
+        self.restart_at = 0.0
+        self.failed = False
+
+
+class ProcessPoolRecognizer(LicensePlateRecognizer):
+    def __init__(self, ocr_confidence: float = 0.6, roi_sink=None, model_dir: str = None,
+                 cache: PlateRecognitionCache = None, workers: int = 2, threads_per_worker: int = 1,
+                 cpu_affinity: List[List[int]] = None, max_jobs_per_worker: int = 500,
+                 max_rss_mb: float = 1500.0, timeout: float = 5.0, max_roi_bytes: int = 1920 * 1080 * 3,
+                 max_restart_failures: int = 5, restart_backoff: float = 1.0, max_restart_backoff: float = 30.0):
+        super().__init__(ocr_confidence=ocr_confidence, roi_sink=roi_sink, model_dir=model_dir, cache=cache)
+        self.worker_count = workers
+        self.threads_per_worker = threads_per_worker
+        self.cpu_affinity = cpu_affinity
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.max_rss_mb = max_rss_mb
+        self.timeout = timeout
+        self.max_roi_bytes = max_roi_bytes
+        self.max_restart_failures = max_restart_failures
+        self.restart_backoff = restart_backoff
+        self.max_restart_backoff = max_restart_backoff
+
+        self.ctx = multiprocessing.get_context('spawn')
+        self.slots = None
+        self.workers = {}
+        self.pending = deque()
+        self.job_ids = itertools.count()
+        self.lock = threading.Lock()
+        self.started = threading.Event()
+        self.running = False
+        self.supervisor = None
+
+    def load(self):
+        # each ROI is handed to its worker through that worker's slot in a shared memory pool
+        self.slots = FramePool((self.max_roi_bytes,), self.worker_count)
+        self.running = True
+
+        with self.lock:
+            for worker_id in range(self.worker_count):
+                self.workers[worker_id] = _OCRWorker()
+                self._spawn(worker_id)
+
+        self.supervisor = threading.Thread(target=self._supervise, name="OCRPoolSupervisor", daemon=True)
+        self.supervisor.start()
+
+        started = self.started.wait(timeout=600)
+        with self.lock:
+            ready = sum(worker.ready for worker in self.workers.values())
+        if not started or not ready:
+            # stops the supervisor too, so nothing keeps restarting workers after a failed load
+            self.close()
+            raise RuntimeError("OCR workers did not become ready")
+        if ready < self.worker_count:
+            self.logger.warning(f"OCR pool running with {ready} of {self.worker_count} workers")
+        self.logger.info(f"OCR pool ready with {ready} workers, {self.threads_per_worker} threads each")
+
+    def _spawn(self, worker_id: int):
+        affinity = None
+        if self.cpu_affinity:
+            affinity = self.cpu_affinity[worker_id % len(self.cpu_affinity)]
+
+        # a pipe per worker: killing one worker can never leave a lock held that the others share
+        task_reader, task_writer = self.ctx.Pipe(duplex=False)
+        result_reader, result_writer = self.ctx.Pipe(duplex=False)
+        process = self.ctx.Process(
+            target=_ocr_worker_main, name=f"ocr-worker-{worker_id}", daemon=True,
+            args=(worker_id, task_reader, result_writer, self.slots.name, self.max_roi_bytes,
+                  self.worker_count, self.threads_per_worker, affinity, self.model_dir,
+                  self.max_jobs_per_worker, self.max_rss_mb))
+        process.start()
+        # drop our copies of the child's ends so a dead worker shows up as EOF on its result pipe
+        task_reader.close()
+        result_writer.close()
+
+        worker = self.workers[worker_id]
+        worker.process = process
+        worker.task_conn = task_writer
+        worker.result_conn = result_reader
+        worker.ready = False
+        worker.recycling = False
+
+    def _retire(self, worker: _OCRWorker):
+        for conn in (worker.task_conn, worker.result_conn):
+            if conn is not None:
+                conn.close()
+        if worker.process is not None:
+            worker.process.join(timeout=1.0)
+        worker.process = worker.task_conn = worker.result_conn = None
+        worker.ready = False
+        worker.recycling = False
+
+    def _supervise(self):
+        while self.running:
+            with self.lock:
+                conns = {w.result_conn: w for w in self.workers.values() if w.result_conn is not None}
+            if conns:
+                readable = multiprocessing.connection.wait(list(conns), timeout=0.2)
+            else:
+                readable = []
+                time.sleep(0.2)
+
+            with self.lock:
+                for conn in readable:
+                    worker = conns[conn]
+                    try:
+                        message = conn.recv()
+                    except (EOFError, OSError):
+                        # the worker has exited; _check_workers restarts it
+                        conn.close()
+                        worker.result_conn = None
+                        continue
+                    self._handle_message(worker, *message)
+                self._check_workers()
+                self._dispatch()
+
+    def _handle_message(self, worker: _OCRWorker, kind: str, job_id: Optional[int], payload):
+        if kind == 'ready':
+            worker.ready = True
+            worker.failures = 0
+            self._update_started()
+        elif kind == 'result':
+            job = worker.job
+            worker.job = None
+            if job is not None and job.job_id == job_id:
+                self._finish(job, payload)
+        elif kind == 'recycle':
+            worker.ready = False
+            worker.recycling = True
+
+    def _update_started(self):
+        live = [worker for worker in self.workers.values() if not worker.failed]
+        if not live or all(worker.ready for worker in live):
+            self.started.set()
+
+    def _check_workers(self):
+        now = time.monotonic()
+        for worker_id, worker in self.workers.items():
+            if worker.failed:
+                continue
+            if worker.process is None:
+                if self.running and now >= worker.restart_at:
+                    self._spawn(worker_id)
+                continue
+
+            job = worker.job
+            if job is not None and now > job.run_deadline:
+                self.logger.warning(f"OCR job for track {job.track_id} timed out, restarting worker {worker_id}")
+                worker.process.kill()
+                worker.job = None
+                self._finish(job, None)
+                self._retire(worker)
+                self._spawn(worker_id)
+            elif not worker.process.is_alive():
+                worker.job = None
+                if job is not None:
+                    self._finish(job, None)
+                exitcode = worker.process.exitcode
+                recycled = worker.recycling and exitcode == 0
+                self._retire(worker)
+                if not self.running or recycled:
+                    worker.restart_at = now
+                    continue
+
+                worker.failures += 1
+                if worker.failures >= self.max_restart_failures:
+                    self.logger.error(f"OCR worker {worker_id} failed {worker.failures} times in a row, giving up")
+                    worker.failed = True
+                    self._update_started()
+                    continue
+
+                delay = min(self.restart_backoff * 2 ** (worker.failures - 1), self.max_restart_backoff)
+                self.logger.warning(f"OCR worker {worker_id} exited with code {exitcode}, "
+                                    f"restarting in {delay:.1f}s")
+                worker.restart_at = now + delay
+
+        while self.pending and now > self.pending[0].deadline:
+            job = self.pending.popleft()
+            self.logger.warning(f"OCR job for track {job.track_id} expired before a worker was free")
+            self._finish(job, None)
+
+    def _dispatch(self):
+        for worker_id, worker in self.workers.items():
+            if not self.pending:
+                return
+            if not worker.ready or worker.job is not None:
+                continue
+
+            job = self.pending.popleft()
+            roi = np.ascontiguousarray(job.roi, dtype=np.uint8)
+            job.roi = None
+            if roi.nbytes > self.max_roi_bytes:
+                self.logger.warning(f"ROI of {roi.nbytes} bytes exceeds OCR slot size, skipping")
+                self._finish(job, None)
+                continue
+
+            self.slots.arrays[worker_id][:roi.nbytes] = roi.reshape(-1)
+            try:
+                worker.task_conn.send((job.job_id, roi.shape))
+            except OSError:
+                # the worker died since its last message; _check_workers restarts it
+                worker.ready = False
+                self._finish(job, None)
+                continue
+            job.run_deadline = time.monotonic() + self.timeout
+            worker.job = job
+
+    def _finish(self, job: _OCRJob, result):
+        # always called under self.lock, so the request bookkeeping in the callbacks is serialised
+        if not job.future.done():
+            job.future.set_result(result)
+
+    def submit_license_plate(self, roi_list: List[np.ndarray], direction: str,
+                             track_id: int = None) -> Future:
+        valid_rois = self._sample_rois(roi_list, direction, track_id) if roi_list else []
+        request = _OCRRequest(direction, track_id, len(valid_rois))
+        if not self.running:
+            request.future.set_result((None, 0.0))
+            return request.future
+
+        jobs = []
+        for i, roi in enumerate(valid_rois):
+            fingerprint = None
+            if self.cache is not None:
+                fingerprint = self.cache.fingerprint(roi)
+                cached = self.cache.get(track_id, fingerprint)
+                if cached is not None:
+                    request.results[i] = cached
+                    continue
+
+            job = _OCRJob(next(self.job_ids), track_id, roi, time.monotonic() + self.timeout)
+            job.future.add_done_callback(partial(self._job_done, request, i, fingerprint))
+            jobs.append(job)
+
+        if not jobs:
+            self._complete(request)
+            return request.future
+
+        request.remaining = len(jobs)
+        with self.lock:
+            self.pending.extend(jobs)
+            self._dispatch()
+        return request.future
+
+    def recognize_license_plate(self, roi_list: List[np.ndarray], direction: str,
+                                track_id: int = None) -> Tuple[Optional[str], float]:
+        # blocking form of submit_license_plate; the supervisor enforces every job's deadline
+        return self.submit_license_plate(roi_list, direction, track_id).result()
+
+    def _job_done(self, request: _OCRRequest, index: int, fingerprint: Optional[int], job_future: Future):
+        result = None if job_future.cancelled() else job_future.result()
+        if result is not None:
+            request.results[index] = result
+            if self.cache is not None:
+                self.cache.put(request.track_id, fingerprint, *result)
+
+        request.remaining -= 1
+        if request.remaining == 0:
+            self._complete(request)
+
+    def _complete(self, request: _OCRRequest):
+        if request.future.cancelled():
+            return
+        result = self._select_best(request.results, request.direction, request.track_id)
+        try:
+            request.future.set_result(result)
+        except InvalidStateError:
+            # cancelled by the frame loop while the last job was finishing
+            pass
+
+    def cancel_track(self, track_id: int):
+        with self.lock:
+            kept = deque()
+            for job in self.pending:
+                if job.track_id == track_id:
+                    job.future.cancel()
+                else:
+                    kept.append(job)
+            self.pending = kept
+            # a running job keeps its worker until it completes; its result only reaches the cache
+
+    def close(self):
+        self.running = False
+        if self.supervisor is not None:
+            self.supervisor.join(timeout=2.0)
+            self.supervisor = None
+
+        with self.lock:
+            for worker in self.workers.values():
+                if worker.job is not None:
+                    self._finish(worker.job, None)
+                    worker.job = None
+                if worker.task_conn is not None:
+                    try:
+                        worker.task_conn.send(None)
+                    except (OSError, ValueError):
+                        pass
+            for worker in self.workers.values():
+                if worker.process is not None:
+                    worker.process.join(timeout=2.0)
+                    if worker.process.is_alive():
+                        worker.process.kill()
+                self._retire(worker)
+            self.workers.clear()
+
+            for job in self.pending:
+                self._finish(job, None)
+            self.pending.clear()
+
+        if self.slots is not None:
+            self.slots.close()
+            self.slots = None
@@ -0,0 +1,96 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+import cv2
+import numpy as np
+from utils.logger import get_logger
+
+
+class PlateRecognitionCache:
+    def __init__(self, max_entries: int = 256, ttl: float = 30.0, max_distance: int = 8,
+                 hash_size: int = 16, log_interval: int = 100):
+        self.logger = get_logger(__name__)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_distance = max_distance
+        self.hash_size = hash_size
+        self.log_interval = log_interval
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def fingerprint(self, roi: np.ndarray) -> int:
+        # difference hash: compares neighbouring pixels, so it ignores scale and global brightness
+        gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY) if roi.ndim == 3 else roi
+        small = cv2.resize(gray, (self.hash_size + 1, self.hash_size), interpolation=cv2.INTER_AREA)
+        bits = small[:, 1:] > small[:, :-1]
+        return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+    def _evict_expired(self, now: float):
+        # entries are kept in LRU order, so this sweeps stale entries from the cold end
+        while self.entries:
+            key, (_, _, stored_at) = next(iter(self.entries.items()))
+            if now - stored_at <= self.ttl:
+                break
+            del self.entries[key]
+
+    def _find(self, track_id: Optional[int], fingerprint: int) -> Optional[Tuple[Optional[int], int]]:
+        # only crops of the same track can match, so a similar looking car never inherits another plate
+        if (track_id, fingerprint) in self.entries:
+            return track_id, fingerprint
+
+        best_key, best_distance = None, self.max_distance + 1
+        for key in self.entries:
+            if key[0] != track_id:
+                continue
+            distance = bin(key[1] ^ fingerprint).count('1')
+            if distance < best_distance:
+                best_key, best_distance = key, distance
+        return best_key
+
+    def get(self, track_id: Optional[int], fingerprint: int) -> Optional[Tuple[Optional[str], float]]:
+        with self.lock:
+            now = time.monotonic()
+            self._evict_expired(now)
+            key = self._find(track_id, fingerprint)
+            if key is not None and now - self.entries[key][2] > self.ttl:
+                del self.entries[key]
+                key = None
+
+            if key is None:
+                self.misses += 1
+                result = None
+            else:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                plate, confidence, _ = self.entries[key]
+                result = (plate, confidence)
+
+            if (self.hits + self.misses) % self.log_interval == 0:
+                self.logger.info(f"OCR cache hit rate {self.hit_rate:.1%} "
+                                 f"({self.hits} hits, {self.misses} misses, {len(self.entries)} entries)")
+            return result
+
+    def put(self, track_id: Optional[int], fingerprint: int, plate: Optional[str], confidence: float):
+        with self.lock:
+            key = (track_id, fingerprint)
+            self.entries.pop(key, None)
+            self.entries[key] = (plate, confidence, time.monotonic())
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hit_rate,
+                'entries': len(self.entries)
+            }
@@ -0,0 +1,93 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+from core.detection.zone_detector import DetectionZone
+from core.tracking.vehicle_tracker import VehicleTracker
+from database.models import ParkingEvent
+from utils.logger import get_logger
+
+
+class ParkingOccupancyEngine:
+    def __init__(self, tracker: VehicleTracker, parking_zones: List[DetectionZone], cell_size: int = 64,
+                 on_event: Callable[[ParkingEvent], None] = None):
+        self.logger = get_logger(__name__)
+        self.tracker = tracker
+        self.cell_size = cell_size
+        self.on_event = on_event
+        self.parked_zone: Dict[int, str] = {}
+        self.counts: Dict[str, int] = {}
+        self.set_zones(parking_zones)
+
+    def set_zones(self, parking_zones: List[DetectionZone]):
+        grid = defaultdict(list)
+        for zone in parking_zones:
+            xs = [p[0] for p in zone.polygon]
+            ys = [p[1] for p in zone.polygon]
+            for cx in range(min(xs) // self.cell_size, max(xs) // self.cell_size + 1):
+                for cy in range(min(ys) // self.cell_size, max(ys) // self.cell_size + 1):
+                    grid[(cx, cy)].append(zone)
+
+        self.grid = dict(grid)
+        self.counts = {zone.name: 0 for zone in parking_zones}
+        for track_id, zone_name in list(self.parked_zone.items()):
+            if zone_name in self.counts:
+                self.counts[zone_name] += 1
+            else:
+                # zone was removed by a config reload
+                self._unpark(track_id, datetime.now())
+
+    def zone_at(self, x: int, y: int) -> Optional[DetectionZone]:
+        for zone in self.grid.get((x // self.cell_size, y // self.cell_size), ()):
+            if zone.contains_point(x, y):
+                return zone
+        return None
+
+    def update(self, track_id: int):
+        track_data = self.tracker.tracks.get(track_id)
+        if track_data is None:
+            return
+
+        now = track_data['last_seen']
+        stationary = self.tracker.is_stationary(track_id, now)
+        parked_zone = self.parked_zone.get(track_id)
+
+        if stationary and parked_zone is None and track_data['last_position']:
+            zone = self.zone_at(*track_data['last_position'])
+            if zone is not None:
+                self._park(track_id, zone.name, datetime.fromtimestamp(now))
+        elif not stationary and parked_zone is not None:
+            self._unpark(track_id, datetime.fromtimestamp(now))
+
+    def retain_tracks(self, active_track_ids: Iterable[int]):
+        active = set(active_track_ids)
+        for track_id in [tid for tid in self.parked_zone if tid not in active]:
+            self._unpark(track_id, datetime.now())
+
+    def occupancy(self, zone_name: str) -> int:
+        return self.counts.get(zone_name, 0)
+
+    def occupancy_counts(self) -> Dict[str, int]:
+        return dict(self.counts)
+
+    def _park(self, track_id: int, zone_name: str, timestamp: datetime):
+        self.parked_zone[track_id] = zone_name
+        self.counts[zone_name] += 1
+        self.tracker.parked_vehicles.add(track_id)
+        self._emit(ParkingEvent(timestamp, track_id, zone_name, 'PARKED', self._plate(track_id)))
+
+    def _unpark(self, track_id: int, timestamp: datetime):
+        zone_name = self.parked_zone.pop(track_id)
+        if zone_name in self.counts:
+            self.counts[zone_name] -= 1
+        self.tracker.parked_vehicles.discard(track_id)
+        self._emit(ParkingEvent(timestamp, track_id, zone_name, 'UNPARKED', self._plate(track_id)))
+
+    def _plate(self, track_id: int) -> Optional[str]:
+        track_data = self.tracker.tracks.get(track_id)
+        return track_data['best_license_plate'] if track_data else None
+
+    def _emit(self, event: ParkingEvent):
+        self.logger.info(f"Track {event.track_id} {event.action} in {event.zone} "
+                         f"(occupancy {self.counts.get(event.zone, 0)})")
+        if self.on_event is not None:
+            self.on_event(event)
@@ -87,12 +87,13 @@ class VehicleTracker:
 
         return None
 
-    def is_parked(self, track_id: int, parking_zones: List[DetectionZone]) -> bool:
+    def is_stationary(self, track_id: int, current_time: float = None) -> bool:
         if track_id not in self.tracks:
             return False
 
         track_data = self.tracks[track_id]
-        current_time = time.time()
+        if current_time is None:
+            current_time = time.time()
 
         if track_data['stationary_start_time'] is None:
             return False
@@ -106,6 +107,13 @@ class VehicleTracker:
             if avg_movement > self.max_parking_movement / 2:
                 return False
 
+        return True
+
+    def is_parked(self, track_id: int, parking_zones: List[DetectionZone]) -> bool:
+        if not self.is_stationary(track_id):
+            return False
+
+        track_data = self.tracks[track_id]
         if track_data['last_position']:
             x, y = track_data['last_position']
             for zone in parking_zones:
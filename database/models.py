@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 from datetime import datetime
+from typing import Optional
 
 @dataclass
 class VehicleEvent:
@@ -7,4 +8,12 @@ class VehicleEvent:
     license_plate: str
     action: str  # 'ENTER' / 'LEAVE'
     confidence: float
-    track_id: int
\ No newline at end of file
+    track_id: int
+
+@dataclass
+class ParkingEvent:
+    timestamp: datetime
+    track_id: int
+    zone: str
+    action: str  # 'PARKED' / 'UNPARKED'
+    license_plate: Optional[str] = None
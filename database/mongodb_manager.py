@@ -1,8 +1,11 @@
 from pymongo import MongoClient
 from pymongo.errors import ConnectionFailure, OperationFailure
 import pymongo
+import threading
+import time
+from collections import deque
 from datetime import datetime
-from database.models import VehicleEvent
+from database.models import ParkingEvent, VehicleEvent
 from utils.logger import get_logger
 
 class MongoDBManager:
@@ -10,24 +13,61 @@ class MongoDBManager:
         self.logger = get_logger(__name__)
         self.config = config['mongodb']
         self.processed_events = set()
-        self._connect()
+        self.connected = threading.Event()
+        self.pending_events = deque(maxlen=1000)
+        self.pending_lock = threading.Lock()
+        self.mongo_client = None
 
-    def _connect(self):
+    def connect(self):
         try:
-            self.mongo_client = MongoClient(self.config['connection_string'])
+            # one client for every attempt: each MongoClient runs its own monitor threads,
+            # and pymongo reconnects an existing client by itself
+            if self.mongo_client is None:
+                self.mongo_client = MongoClient(self.config['connection_string'],
+                                                serverSelectionTimeoutMS=self.config.get('server_selection_timeout_ms', 5000))
             self.mongo_client.admin.command('ping')
 
             self.db = self.mongo_client[self.config['database_name']]
             self.vehicle_events_collection = self.db[self.config['vehicle_events_collection']]
             self.openalpr_results_collection = self.db[self.config['openalpr_results_collection']]
+            self.parking_events_collection = self.db[self.config.get('parking_events_collection', 'parking_events')]
 
             self._setup_indexes()
             self.logger.info(f"MongoDB connection established: {self.config['database_name']}")
 
+            # flush under the lock and only then mark connected, so queued events are
+            # written before anything logged after the connection came up
+            with self.pending_lock:
+                while self.pending_events:
+                    write_fn, event = self.pending_events.popleft()
+                    write_fn(event)
+                self.connected.set()
+
         except ConnectionFailure as e:
             self.logger.error(f"Failed to connect to MongoDB: {e}")
             raise e
 
+    def connect_with_retry(self, initial_delay: float = 1.0, max_delay: float = 30.0):
+        delay = initial_delay
+        while True:
+            try:
+                self.connect()
+                return
+            except Exception as e:
+                self.logger.warning(f"MongoDB unavailable ({e}), retrying in {delay:.0f}s "
+                                    f"with {len(self.pending_events)} events queued")
+                time.sleep(delay)
+                delay = min(delay * 2, max_delay)
+
+    def _queue_if_disconnected(self, write_fn, event) -> bool:
+        with self.pending_lock:
+            if self.connected.is_set():
+                return False
+            if len(self.pending_events) == self.pending_events.maxlen:
+                self.logger.warning("Database event queue full, dropping the oldest queued event")
+            self.pending_events.append((write_fn, event))
+            return True
+
     def _setup_indexes(self):
         try:
             self.vehicle_events_collection.create_index([
@@ -44,12 +84,21 @@ class MongoDBManager:
                 ("timestamp", pymongo.DESCENDING)
             ])
 
+            self.parking_events_collection.create_index([
+                ("zone", pymongo.ASCENDING),
+                ("timestamp", pymongo.DESCENDING)
+            ])
+
             self.logger.info("MongoDB indexes created successfully")
 
         except Exception as e:
             self.logger.warning(f"Failed to create some indexes: {e}")
 
     def log_vehicle_event(self, event: VehicleEvent):
+        if not self._queue_if_disconnected(self._write_vehicle_event, event):
+            self._write_vehicle_event(event)
+
+    def _write_vehicle_event(self, event: VehicleEvent):
         event_key = f"{event.track_id}_{event.action}_{event.license_plate}"
         if event_key in self.processed_events:
             return
@@ -71,8 +120,34 @@ class MongoDBManager:
         except Exception as e:
             self.logger.error(f"MongoDB error while logging event: {e}")
 
+    def log_parking_event(self, event: ParkingEvent):
+        if not self._queue_if_disconnected(self._write_parking_event, event):
+            self._write_parking_event(event)
+
+    def _write_parking_event(self, event: ParkingEvent):
+        try:
+            document = {
+                "timestamp": event.timestamp,
+                "track_id": event.track_id,
+                "zone": event.zone,
+                "action": event.action,
+                "license_plate": event.license_plate,
+                "created_at": datetime.now()
+            }
+
+            result = self.parking_events_collection.insert_one(document)
+            self.logger.info(f"Logged parking event: track {event.track_id} {event.action} in {event.zone}, "
+                             f"ObjectId: {result.inserted_id}")
+
+        except Exception as e:
+            self.logger.error(f"MongoDB error while logging parking event: {e}")
+
     def save_openalpr_results(self, timestamp: str, best_plate: str, best_confidence: float,
                               direction: str, snapshot_path: str, alpr_results: dict, track_id: int):
+        if not self.connected.is_set():
+            self.logger.warning(f"Database not ready, skipping OpenALPR results for track {track_id}")
+            return
+
         try:
             document = {
                 "timestamp": timestamp,
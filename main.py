@@ -1,8 +1,15 @@
 #!/usr/bin/env python3
+import argparse
 from system.lpr_system import LPRGateSystem
 
 def main():
-    system = LPRGateSystem()
+    parser = argparse.ArgumentParser(description="LPR Gate System")
+    parser.add_argument('--headless', action='store_true', help="run without display windows")
+    parser.add_argument('--camera', help="camera profile from the 'cameras' section of the config")
+    parser.add_argument('--config', default="config/lpr_config.json", help="path to the config file")
+    args = parser.parse_args()
+
+    system = LPRGateSystem(headless=args.headless, camera=args.camera, config_file=args.config)
     system.run()
 
 if __name__ == "__main__":
@@ -1,65 +1,169 @@
-import cv2
 from datetime import datetime
 from config.config_loader import ConfigLoader
+from config.config_schema import CameraProfile
+from config.config_watcher import ConfigWatcher
+from core.capture.video_capture import ThreadedVideoCapture
 from core.detection.vehicle_detector import VehicleDetector
 from core.detection.zone_detector import ZoneManager
 from core.tracking.simple_tracker import SimpleTracker
 from core.tracking.vehicle_tracker import VehicleTracker
+from core.tracking.occupancy import ParkingOccupancyEngine
 from core.recognition.license_plate_recognizer import LicensePlateRecognizer
+from core.recognition.ocr_worker_pool import ProcessPoolRecognizer
 from core.recognition.openalpr_processor import OpenALPRProcessor
+from core.recognition.plate_cache import PlateRecognitionCache
 from database.mongodb_manager import MongoDBManager
 from database.models import VehicleEvent
+from system.output_sinks import create_sinks
+from utils.background_loader import BackgroundLoader
 from utils.logger import get_logger
 
 class LPRGateSystem:
-    def __init__(self):
-        self.config = ConfigLoader.load_config()
+    def __init__(self, headless: bool = False, camera: str = None,
+                 config_file: str = "config/lpr_config.json"):
+        self.config, profile = ConfigLoader.load_profile(config_file, camera)
         self.logger = get_logger(__name__)
+        self.display, self.recorder = create_sinks(self.config, headless=headless)
 
-        self.zone_manager = ZoneManager(self.config)
-        self.detector = VehicleDetector(confidence=self.config['detection_confidence'])
+        self.zone_manager = ZoneManager(profile)
+        self.config_watcher = ConfigWatcher(config_file, camera, self.apply_profile,
+                                            interval=self.config.get('config_reload_interval', 2.0))
+        self.detector = VehicleDetector(model_path=self.config['detector_model'],
+                                        confidence=self.config['detection_confidence'],
+                                        backend=self.config.get('detector_backend', 'ultralytics'),
+                                        export_format=self.config.get('detector_export_format'),
+                                        model_cache_dir=self.config.get('model_cache_dir', 'models'),
+                                        input_size=self.config.get('detector_input_size', 640),
+                                        intra_op_threads=self.config.get('detector_threads', 0),
+                                        quantize=self.config.get('detector_quantize', False))
         self.tracker = VehicleTracker()
         self.simple_tracker = SimpleTracker()
-        self.plate_recognizer = LicensePlateRecognizer(ocr_confidence=self.config['ocr_confidence'])
+        self.plate_recognizer = self._create_plate_recognizer()
         self.openalpr = OpenALPRProcessor(openalpr_path=r"alpr_binary/openalpr.exe")
         self.db = MongoDBManager(self.config)
+        self.occupancy = ParkingOccupancyEngine(self.tracker, self.zone_manager.parking_zones,
+                                                on_event=self.db.log_parking_event)
+        # the zone manager whose parking zones the occupancy engine currently uses
+        self.occupancy_zone_manager = self.zone_manager
 
         self.frame_count = 0
-        self.out = cv2.VideoWriter('playback.mp4', cv2.VideoWriter_fourcc(*'mp4v'), 25.0, (1920, 1080))
+        self.processed_count = 0
+        # track id -> (future, direction) for OCR that is still running
+        self.ocr_pending = {}
+        self.vehicles_present = False
+
+        # models and the database come up in the background while the camera opens
+        self.loaders = {
+            'detector': BackgroundLoader('detector', self.detector.load).start(),
+            'ocr': BackgroundLoader('ocr', self.plate_recognizer.load).start(),
+            'database': BackgroundLoader('database', self.db.connect_with_retry).start()
+        }
+
+    def _create_plate_recognizer(self) -> LicensePlateRecognizer:
+        pool_config = self.config.get('ocr_pool', {})
+        if not pool_config.get('enabled', False):
+            return LicensePlateRecognizer(ocr_confidence=self.config['ocr_confidence'],
+                                          roi_sink=self.display,
+                                          model_dir=self.config.get('ocr_model_dir'),
+                                          cache=self._create_ocr_cache())
+
+        return ProcessPoolRecognizer(ocr_confidence=self.config['ocr_confidence'],
+                                     roi_sink=self.display,
+                                     model_dir=self.config.get('ocr_model_dir'),
+                                     cache=self._create_ocr_cache(),
+                                     workers=pool_config.get('workers', 2),
+                                     threads_per_worker=pool_config.get('threads_per_worker', 1),
+                                     cpu_affinity=pool_config.get('cpu_affinity'),
+                                     max_jobs_per_worker=pool_config.get('max_jobs_per_worker', 500),
+                                     max_rss_mb=pool_config.get('max_rss_mb', 1500.0),
+                                     timeout=pool_config.get('timeout_seconds', 5.0),
+                                     max_restart_failures=pool_config.get('max_restart_failures', 5))
+
+    def _create_ocr_cache(self):
+        cache_config = self.config.get('ocr_cache', {})
+        if not cache_config.get('enabled', True):
+            return None
+        return PlateRecognitionCache(max_entries=cache_config.get('max_entries', 256),
+                                     ttl=cache_config.get('ttl_seconds', 30.0),
+                                     max_distance=cache_config.get('max_distance', 8),
+                                     hash_size=cache_config.get('hash_size', 16))
+
+    def readiness(self) -> dict:
+        return {name: loader.state for name, loader in self.loaders.items()}
+
+    def apply_profile(self, profile: CameraProfile):
+        current = self.zone_manager.profile
+        needs_restart = profile.restart_changes(current)
+        if needs_restart:
+            self.logger.warning(f"Changes to {', '.join(needs_restart)} need a restart; "
+                                f"applying zones and thresholds only")
+
+        zone_manager = ZoneManager(profile)
+        self.detector.confidence = profile.detection_confidence
+        self.plate_recognizer.ocr_confidence = profile.ocr_confidence
+        # the frame loop reads zone_manager once per frame, so this swap is atomic for it;
+        # the occupancy engine is not thread safe and picks up the new zones on the frame thread
+        self.zone_manager = zone_manager
 
     def run(self):
-        cap = cv2.VideoCapture(self.config['camera_source'])
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1920)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 1080)
+        sinks = [sink for sink in (self.display, self.recorder) if sink is not None]
+        capture = ThreadedVideoCapture.from_config(
+            self.config, extra_buffers=sum(sink.queue.maxsize + 1 for sink in sinks))
 
-        if not cap.isOpened():
+        if not capture.open():
             self.logger.error("Failed to open video source")
             return
 
+        for sink in sinks:
+            sink.start()
+        self.config_watcher.start()
+
         try:
             while True:
-                ret, frame = cap.read()
+                ret, frame_buf, detection_buf = capture.read()
                 if not ret:
                     self.logger.warning("Frame not captured")
                     break
 
-                frame = cv2.resize(frame, (1920, 1080))
-                processed = self.process_frame(frame)
-                cv2.imshow("LPR Gate System", processed)
-                self.out.write(processed)
+                try:
+                    self.process_frame(frame_buf.array, detection_buf.array)
+
+                    if self.recorder is not None:
+                        self.recorder.record(frame_buf, active=self.vehicles_present)
 
-                key = cv2.waitKey(1) & 0xFF
-                if key == ord('q'):
+                    if self.display is not None:
+                        self.display.show_frame(frame_buf)
+                finally:
+                    frame_buf.release()
+                    detection_buf.release()
+                    # drop the views too, so nothing keeps a pooled slot alive at shutdown
+                    frame_buf = detection_buf = None
+
+                if self.display is not None and self.display.quit_requested.is_set():
                     break
         finally:
-            cap.release()
-            self.out.release()
-            cv2.destroyAllWindows()
+            self.config_watcher.stop()
+            for sink in sinks:
+                sink.stop()
+            capture.release()
+            self.plate_recognizer.close()
 
-    def process_frame(self, frame):
+    def process_frame(self, frame, detection_frame=None):
         self.frame_count += 1
-        gate_mask = self.zone_manager.gate_zone.create_mask(frame.shape)
-        detections = self.detector.detect(frame, mask=gate_mask)
+        zone_manager = self.zone_manager
+        profile = zone_manager.profile
+        if zone_manager is not self.occupancy_zone_manager:
+            self.occupancy.set_zones(zone_manager.parking_zones)
+            self.occupancy_zone_manager = zone_manager
+        if not self.loaders['detector'].ready or self.frame_count % profile.detection_stride != 0:
+            return frame
+
+        self.processed_count += 1
+        if detection_frame is None:
+            detection_frame = frame
+        scale = detection_frame.shape[1] / frame.shape[1]
+        detection_mask = zone_manager.detection_mask(detection_frame.shape, scale=scale)
+        detections = self.detector.detect(detection_frame, mask=detection_mask, scale=scale)
 
         rects = [(x1, y1, x2 - x1, y2 - y1) for x1, y1, x2, y2, _ in detections]
         tracks = self.simple_tracker.update(rects)
@@ -67,31 +171,68 @@ class LPRGateSystem:
         now = datetime.now()
         for track in tracks:
             tid = track.track_id
+            if self.simple_tracker.disappeared.get(tid, 0) > 0:
+                # not matched this frame; its old centroid would read as zero movement
+                continue
             bbox = tuple(map(int, track.to_ltrb()))
             self.tracker.update_track(tid, bbox)
+            self.occupancy.update(tid)
             td = self.tracker.tracks[tid]
 
-            if self.frame_count % 10 == 0 and self.zone_manager.ocr_zone.contains_point(*td['last_position']):
+            if (self.processed_count % profile.ocr_sample_interval == 0 and
+                    zone_manager.ocr_zone.contains_point(*td['last_position'])):
                 roi = self.plate_recognizer.extract_license_plate_roi(frame, bbox)
                 if roi is not None and roi.size > 0:
-                    self.tracker.plate_roi_temp[tid].append(roi)
+                    # copy so the retained crop does not pin the pooled frame
+                    self.tracker.plate_roi_temp[tid].append(roi.copy())
 
             direction = self.tracker.get_movement_direction(tid)
-            if (tid not in self.tracker.ocr_done and direction and
-                len(self.tracker.plate_roi_temp[tid]) >= 3):
-
-                plate, conf = self.plate_recognizer.recognize_license_plate(
+            if (self.loaders['ocr'].ready and tid not in self.tracker.ocr_done and
+                    tid not in self.ocr_pending and direction and len(self.tracker.plate_roi_temp[tid]) >= 3):
+                # the result is collected on a later frame so OCR never stalls the frame loop
+                future = self.plate_recognizer.submit_license_plate(
                     list(self.tracker.plate_roi_temp[tid]), direction, tid)
+                self.ocr_pending[tid] = (future, direction)
+
+        self._collect_ocr_results(now)
+        # parked cars are inside the detection mask too, but only gate traffic should start a recording
+        self.vehicles_present = any(self._in_gate_traffic(track.track_id, zone_manager) for track in tracks)
 
-                if plate:
-                    td['best_license_plate'] = plate
-                    td['best_confidence'] = conf
-                    self.tracker.ocr_done.add(tid)
-                    self.db.log_vehicle_event(VehicleEvent(
-                        timestamp=now,
-                        license_plate=plate,
-                        action=direction,
-                        confidence=conf,
-                        track_id=tid
-                    ))
+        live_tracks = self.simple_tracker.objects.keys()
+        self.occupancy.retain_tracks(live_tracks)
+        gone = [tid for tid in set(self.tracker.plate_roi_temp) | set(self.ocr_pending) if tid not in live_tracks]
+        for tid in gone:
+            # the vehicle has left; stop any OCR still queued for it and drop its crops
+            pending = self.ocr_pending.pop(tid, None)
+            if pending is not None:
+                pending[0].cancel()
+            self.plate_recognizer.cancel_track(tid)
+            self.tracker.plate_roi_temp.pop(tid, None)
         return frame
+
+    def _in_gate_traffic(self, tid: int, zone_manager: ZoneManager) -> bool:
+        td = self.tracker.tracks.get(tid)
+        return (td is not None and td['last_position'] is not None and tid not in self.occupancy.parked_zone and
+                zone_manager.gate_zone.contains_point(*td['last_position']))
+
+    def _collect_ocr_results(self, now: datetime):
+        for tid in [tid for tid, (future, _) in self.ocr_pending.items() if future.done()]:
+            future, direction = self.ocr_pending.pop(tid)
+            if future.cancelled():
+                continue
+
+            plate, conf = future.result()
+            td = self.tracker.tracks.get(tid)
+            if not plate or td is None:
+                continue
+
+            td['best_license_plate'] = plate
+            td['best_confidence'] = conf
+            self.tracker.ocr_done.add(tid)
+            self.db.log_vehicle_event(VehicleEvent(
+                timestamp=now,
+                license_plate=plate,
+                action=direction,
+                confidence=conf,
+                track_id=tid
+            ))
@@ -0,0 +1,244 @@
+import os
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from datetime import datetime
+from queue import Queue, Full, Empty
+import cv2
+import numpy as np
+from utils.frame_pool import FrameBuffer
+from utils.logger import get_logger
+
+
+class FrameSink(ABC):
+    def __init__(self, name: str, max_queue: int = 2):
+        self.logger = get_logger(__name__)
+        self.name = name
+        self.queue = Queue(maxsize=max_queue)
+        self.dropped_frames = 0
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._worker, name=self.name, daemon=True)
+        self.thread.start()
+
+    def submit(self, item, buffer: FrameBuffer = None) -> bool:
+        if buffer is not None:
+            buffer.retain()
+        try:
+            self.queue.put_nowait((item, buffer))
+            return True
+        except Full:
+            self.dropped_frames += 1
+            if buffer is not None:
+                buffer.release()
+            return False
+
+    def _drain(self):
+        while True:
+            try:
+                entry = self.queue.get_nowait()
+            except Empty:
+                return
+            if entry is not None and entry[1] is not None:
+                entry[1].release()
+
+    def stop(self, timeout: float = 5.0):
+        if self.thread is None:
+            return
+        self.queue.put(None)
+        self.thread.join(timeout)
+        self.thread = None
+        if self.dropped_frames:
+            self.logger.info(f"{self.name} dropped {self.dropped_frames} frames")
+
+    def _worker(self):
+        try:
+            while True:
+                entry = self.queue.get()
+                if entry is None:
+                    break
+                item, buffer = entry
+                try:
+                    self.handle(item)
+                except Exception as e:
+                    self.logger.error(f"{self.name} error: {e}", exc_info=True)
+                finally:
+                    if buffer is not None:
+                        buffer.release()
+        finally:
+            self._drain()
+            self.close()
+
+    @abstractmethod
+    def handle(self, item):
+        pass
+
+    def close(self):
+        pass
+
+
+class DisplaySink(FrameSink):
+    def __init__(self, window_name: str = "LPR Gate System", show_roi_windows: bool = False):
+        super().__init__("DisplaySink", max_queue=4)
+        self.window_name = window_name
+        self.show_roi_windows = show_roi_windows
+        self.quit_requested = threading.Event()
+        # set when the display fails (e.g. no X server); the pipeline keeps running without it
+        self.disabled = False
+
+    def show_frame(self, frame_buf: FrameBuffer):
+        if not self.disabled:
+            self.submit((self.window_name, frame_buf.array), frame_buf)
+
+    def show_roi(self, title: str, roi: np.ndarray):
+        if not self.disabled and self.show_roi_windows and roi is not None and roi.size > 0:
+            self.submit((title, roi))
+
+    def _worker(self):
+        # HighGUI needs a steady waitKey pump on the thread that owns the windows
+        try:
+            while not self.quit_requested.is_set():
+                try:
+                    entry = self.queue.get(timeout=0.05)
+                except Empty:
+                    entry = False
+                if entry is None:
+                    break
+                if entry:
+                    item, buffer = entry
+                    try:
+                        self.handle(item)
+                    finally:
+                        if buffer is not None:
+                            buffer.release()
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    self.quit_requested.set()
+        except Exception as e:
+            self.logger.error(f"Display error, continuing without display: {e}", exc_info=True)
+            self.disabled = True
+        finally:
+            self._drain()
+            self.close()
+
+    def stop(self, timeout: float = 5.0):
+        if self.thread is None:
+            return
+        self.quit_requested.set()
+        try:
+            self.queue.put_nowait(None)
+        except Full:
+            pass
+        self.thread.join(timeout)
+        self.thread = None
+
+    def handle(self, item):
+        title, image = item
+        cv2.imshow(title, image)
+
+    def close(self):
+        try:
+            cv2.destroyAllWindows()
+        except cv2.error:
+            pass
+
+
+class RecordingSink(FrameSink):
+    def __init__(self, output_dir: str = "recordings", mode: str = "event", fps: float = 25.0,
+                 pre_event_seconds: float = 3.0, post_event_seconds: float = 5.0, codec: str = "mp4v",
+                 pre_event_quality: int = 80, pre_event_fps: float = 5.0):
+        super().__init__("RecordingSink", max_queue=8)
+        if mode not in ("continuous", "event"):
+            raise ValueError(f"Unknown recording mode: {mode}")
+
+        self.output_dir = output_dir
+        self.mode = mode
+        self.fps = fps
+        self.codec = codec
+        self.pre_event_frames = int(pre_event_seconds * fps)
+        self.post_event_frames = int(post_event_seconds * fps)
+        self.pre_event_quality = pre_event_quality
+        # idle frames are only kept every pre_event_step frames and repeated on flush to keep the timing
+        self.pre_event_step = max(1, round(fps / pre_event_fps)) if pre_event_fps else 1
+        self.pre_buffer = deque(maxlen=max(1, -(-self.pre_event_frames // self.pre_event_step)))
+        self.idle_frames = 0
+        self.writer = None
+        self.post_frames_left = 0
+
+        os.makedirs(self.output_dir, exist_ok=True)
+
+    def record(self, frame_buf: FrameBuffer, active: bool = True):
+        self.submit((frame_buf.array, active), frame_buf)
+
+    def handle(self, item):
+        frame, active = item
+
+        if self.mode == "continuous" or active:
+            if self.writer is None:
+                self._open_writer(frame.shape)
+                self._flush_pre_buffer()
+            self.writer.write(frame)
+            self.post_frames_left = self.post_event_frames
+        elif self.writer is not None and self.post_frames_left > 0:
+            self.writer.write(frame)
+            self.post_frames_left -= 1
+        else:
+            self._close_writer()
+            self._buffer_frame(frame)
+
+    def _buffer_frame(self, frame: np.ndarray):
+        # pooled frames are recycled once handled, so the ring keeps JPEG copies:
+        # roughly 0.2-0.4 MB per 1080p frame instead of 6 MB raw, for one encode per pre_event_step frames
+        if self.pre_event_frames == 0:
+            return
+        self.idle_frames += 1
+        if (self.idle_frames - 1) % self.pre_event_step:
+            return
+        ok, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.pre_event_quality])
+        if ok:
+            self.pre_buffer.append(encoded)
+
+    def _flush_pre_buffer(self):
+        while self.pre_buffer:
+            frame = cv2.imdecode(self.pre_buffer.popleft(), cv2.IMREAD_COLOR)
+            for _ in range(self.pre_event_step):
+                self.writer.write(frame)
+        self.idle_frames = 0
+
+    def _open_writer(self, frame_shape):
+        h, w = frame_shape[:2]
+        path = os.path.join(self.output_dir, f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.mp4")
+        self.writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*self.codec), self.fps, (w, h))
+        self.logger.info(f"Recording started: {path}")
+
+    def _close_writer(self):
+        if self.writer is not None:
+            self.writer.release()
+            self.writer = None
+            self.logger.info("Recording stopped")
+
+    def close(self):
+        self._close_writer()
+        self.pre_buffer.clear()
+
+
+def create_sinks(config: dict, headless: bool = False):
+    display = None
+    if config.get('display', True) and not headless:
+        display = DisplaySink(show_roi_windows=config.get('debug_roi_windows', False))
+
+    recorder = None
+    recording = config.get('recording', {})
+    if recording.get('mode', 'off') != 'off':
+        recorder = RecordingSink(
+            output_dir=recording.get('output_dir', 'recordings'),
+            mode=recording['mode'],
+            fps=recording.get('fps', 25.0),
+            pre_event_seconds=recording.get('pre_event_seconds', 3.0),
+            post_event_seconds=recording.get('post_event_seconds', 5.0),
+            codec=recording.get('codec', 'mp4v'),
+            pre_event_quality=recording.get('pre_event_quality', 80),
+            pre_event_fps=recording.get('pre_event_fps', 5.0)
+        )
+
+    return display, recorder
@@ -0,0 +1,91 @@
+import copy
+import json
+import pytest
+from config.config_loader import ConfigLoader
+from config.config_schema import ConfigError, parse_camera_profile
+from config.config_watcher import ConfigWatcher
+
+BASE_CONFIG = {
+    "camera_source": 0,
+    "detection_confidence": 0.5,
+    "ocr_confidence": 0.6,
+    "parking_zones": [
+        {"name": "parking_left", "points": [[50, 300], [300, 300], [300, 500], [50, 500]]}
+    ],
+    "detection_zones": [
+        {"name": "gate_1", "points": [[400, 200], [800, 200], [800, 600], [400, 600]]},
+        {"name": "detection_2", "points": [[500, 300], [700, 300], [700, 400], [500, 400]]}
+    ],
+    "zone_roles": {"gate": "gate_1", "ocr": "detection_2"}
+}
+
+
+def _config(**overrides):
+    config = copy.deepcopy(BASE_CONFIG)
+    config.update(overrides)
+    return config
+
+
+def test_valid_profile():
+    profile = parse_camera_profile(_config())
+    assert profile.gate_zone == "gate_1"
+    assert profile.ocr_zone == "detection_2"
+    assert [zone.name for zone in profile.parking_zones] == ["parking_left"]
+
+
+@pytest.mark.parametrize("roles", [["x"], "gate_1", 3])
+def test_zone_roles_must_be_object(roles):
+    with pytest.raises(ConfigError):
+        parse_camera_profile(_config(zone_roles=roles))
+
+
+def test_zone_role_must_name_a_zone():
+    with pytest.raises(ConfigError):
+        parse_camera_profile(_config(zone_roles={"gate": ["gate_1"]}))
+
+
+@pytest.mark.parametrize("value", [True, False, 0, 1.5, "0.5"])
+def test_fraction_rejects_bad_values(value):
+    with pytest.raises(ConfigError):
+        parse_camera_profile(_config(detection_confidence=value))
+
+
+def test_missing_camera_source():
+    config = _config()
+    del config["camera_source"]
+    with pytest.raises(ConfigError):
+        parse_camera_profile(config)
+
+
+@pytest.mark.parametrize("cameras", [{"lot": "rtsp://cam"}, {"lot": ["x"]}, ["lot"]])
+def test_resolve_camera_rejects_bad_shapes(cameras):
+    with pytest.raises(ConfigError):
+        ConfigLoader.resolve_camera(_config(cameras=cameras), "lot")
+
+
+def test_watcher_rejects_bad_shapes(tmp_path):
+    config_file = tmp_path / "lpr_config.json"
+    applied = []
+    watcher = ConfigWatcher(str(config_file), "lot", applied.append)
+
+    for cameras in ({"lot": "rtsp://cam"}, {"lot": {"zone_roles": ["x"]}}):
+        config_file.write_text(json.dumps(_config(cameras=cameras)))
+        assert watcher.reload() is False
+
+    config_file.write_text(json.dumps(_config(cameras={"lot": {"camera_source": "rtsp://cam"}})))
+    assert watcher.reload() is True
+    assert applied[-1].name == "lot"
+    assert applied[-1].camera_source == "rtsp://cam"
+
+
+def test_restart_changes_lists_settings_outside_hot_reload():
+    current = parse_camera_profile(_config(capture={"width": 1920}, recording={"mode": "event"}))
+    assert current.restart_changes(parse_camera_profile(_config(
+        capture={"width": 1920}, recording={"mode": "event"}, detection_confidence=0.7,
+        zone_roles={"gate": "detection_2", "ocr": "gate_1"}))) == []
+
+    changed = parse_camera_profile(_config(capture={"width": 1280}, recording={"mode": "continuous"},
+                                           ocr_pool={"enabled": True}))
+    assert current.restart_changes(changed) == ["capture", "ocr_pool", "recording"]
+    assert parse_camera_profile(_config()).restart_changes(
+        parse_camera_profile(_config(camera_source=1))) == ["camera_source"]
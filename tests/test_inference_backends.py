@@ -0,0 +1,70 @@
+import os
+import pytest
+
+np = pytest.importorskip("numpy")
+cv2 = pytest.importorskip("cv2")
+pytest.importorskip("onnxruntime")
+pytest.importorskip("ultralytics")
+
+from core.detection.inference_backends import check_parity, create_backend
+
+MODEL_PATH = os.environ.get("LPR_TEST_MODEL", "yolov8n.pt")
+VEHICLE_CLASSES = [2, 3, 5, 7]
+
+
+def _synthetic_frame() -> np.ndarray:
+    frame = np.full((720, 1280, 3), 90, dtype=np.uint8)
+    cv2.rectangle(frame, (0, 450), (1280, 720), (60, 60, 60), -1)
+    # a car-like silhouette: body, cabin, wheels
+    cv2.rectangle(frame, (420, 330), (860, 470), (30, 30, 160), -1)
+    cv2.rectangle(frame, (510, 260), (760, 335), (40, 40, 140), -1)
+    cv2.circle(frame, (500, 475), 40, (20, 20, 20), -1)
+    cv2.circle(frame, (780, 475), 40, (20, 20, 20), -1)
+    return frame
+
+
+def _frames():
+    frames = [_synthetic_frame()]
+    try:
+        from ultralytics.utils import ASSETS
+        bus = cv2.imread(str(ASSETS / "bus.jpg"))
+        if bus is not None:
+            frames.append(bus)
+    except ImportError:
+        pass
+    return frames
+
+
+@pytest.fixture(scope="module")
+def reference():
+    if not os.path.exists(MODEL_PATH):
+        pytest.skip(f"model weights {MODEL_PATH} not available")
+    backend = create_backend("ultralytics", MODEL_PATH)
+    backend.load()
+    return backend
+
+
+def test_onnxruntime_matches_pytorch(reference, tmp_path_factory):
+    candidate = create_backend("onnxruntime", MODEL_PATH, model_cache_dir=str(tmp_path_factory.mktemp("models")))
+    candidate.load()
+
+    # the PyTorch path letterboxes to a rectangle, the ONNX export to a square,
+    # so boxes and scores drift slightly
+    report = check_parity(reference, candidate, _frames(), conf=0.5, classes=VEHICLE_CLASSES,
+                          min_iou=0.85, max_conf_delta=0.1)
+
+    assert report['passed'], report
+
+
+def test_onnxruntime_returns_predictions_in_frame_coordinates(tmp_path_factory):
+    if not os.path.exists(MODEL_PATH):
+        pytest.skip(f"model weights {MODEL_PATH} not available")
+    backend = create_backend("onnxruntime", MODEL_PATH, model_cache_dir=str(tmp_path_factory.mktemp("models")))
+    backend.load()
+
+    frame = _synthetic_frame()
+    h, w = frame.shape[:2]
+    for x1, y1, x2, y2, conf, class_id in backend.predict(frame, 0.25):
+        assert -1 <= x1 < x2 <= w + 1
+        assert -1 <= y1 < y2 <= h + 1
+        assert 0.25 <= conf <= 1.0
@@ -0,0 +1,88 @@
+import pytest
+
+pytest.importorskip("cv2")
+
+from core.detection.zone_detector import DetectionZone
+from core.tracking.occupancy import ParkingOccupancyEngine
+from core.tracking.vehicle_tracker import VehicleTracker
+
+LEFT = DetectionZone("parking_left", [[50, 300], [300, 300], [300, 500], [50, 500]])
+RIGHT = DetectionZone("parking_right", [[900, 300], [1200, 300], [1200, 500], [900, 500]])
+
+
+def _bbox(x, y):
+    return x - 40, y - 60, x + 40, y + 60
+
+
+def _make_engine(*zones):
+    tracker = VehicleTracker()
+    events = []
+    engine = ParkingOccupancyEngine(tracker, list(zones), on_event=events.append)
+    return tracker, engine, events
+
+
+def _stand(tracker, engine, track_id, x, y):
+    # two updates at the same spot, with the stationary period already elapsed
+    tracker.update_track(track_id, _bbox(x, y))
+    tracker.update_track(track_id, _bbox(x, y))
+    track = tracker.tracks[track_id]
+    track['stationary_start_time'] = track['last_seen'] - tracker.min_parking_time - 1
+    engine.update(track_id)
+
+
+def _drive(tracker, engine, track_id, x, y):
+    tracker.update_track(track_id, _bbox(x, y))
+    engine.update(track_id)
+
+
+def test_park_and_unpark():
+    tracker, engine, events = _make_engine(LEFT, RIGHT)
+    _stand(tracker, engine, 1, 150, 400)
+    _stand(tracker, engine, 2, 1000, 400)
+    assert engine.occupancy_counts() == {"parking_left": 1, "parking_right": 1}
+    assert 1 in tracker.parked_vehicles
+
+    _drive(tracker, engine, 1, 150 + tracker.max_parking_movement + 50, 400)
+    assert engine.occupancy_counts() == {"parking_left": 0, "parking_right": 1}
+    assert 1 not in tracker.parked_vehicles
+    assert [(e.track_id, e.zone, e.action) for e in events] == [
+        (1, "parking_left", "PARKED"), (2, "parking_right", "PARKED"), (1, "parking_left", "UNPARKED")]
+
+
+def test_stationary_outside_zones_is_not_parked():
+    tracker, engine, events = _make_engine(LEFT)
+    _stand(tracker, engine, 1, 600, 400)
+    assert engine.occupancy("parking_left") == 0
+    assert events == []
+
+
+def test_parking_is_reported_once():
+    tracker, engine, events = _make_engine(LEFT)
+    _stand(tracker, engine, 1, 150, 400)
+    _stand(tracker, engine, 1, 150, 400)
+    assert engine.occupancy("parking_left") == 1
+    assert len(events) == 1
+
+
+def test_retain_tracks_unparks_vanished_tracks():
+    tracker, engine, events = _make_engine(LEFT)
+    _stand(tracker, engine, 1, 150, 400)
+    _stand(tracker, engine, 2, 200, 450)
+    engine.retain_tracks([2])
+    assert engine.occupancy("parking_left") == 1
+    assert engine.parked_zone == {2: "parking_left"}
+    assert events[-1].action == "UNPARKED" and events[-1].track_id == 1
+
+
+def test_set_zones_recounts_and_unparks_removed_zones():
+    tracker, engine, events = _make_engine(LEFT, RIGHT)
+    _stand(tracker, engine, 1, 150, 400)
+    _stand(tracker, engine, 2, 1000, 400)
+
+    moved_left = DetectionZone("parking_left", [[40, 290], [310, 290], [310, 510], [40, 510]])
+    engine.set_zones([moved_left])
+    assert engine.occupancy_counts() == {"parking_left": 1}
+    assert engine.parked_zone == {1: "parking_left"}
+    assert (events[-1].track_id, events[-1].zone, events[-1].action) == (2, "parking_right", "UNPARKED")
+    assert engine.zone_at(1000, 400) is None
+    assert engine.zone_at(45, 295) is moved_left
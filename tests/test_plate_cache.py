@@ -0,0 +1,34 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+cv2 = pytest.importorskip("cv2")
+
+from core.recognition.plate_cache import PlateRecognitionCache
+
+
+def _plate_crop(text: str) -> np.ndarray:
+    crop = np.full((80, 120, 3), (90, 90, 90), dtype=np.uint8)
+    cv2.rectangle(crop, (0, 0), (119, 30), (60, 60, 140), -1)
+    cv2.rectangle(crop, (10, 40), (110, 70), (230, 230, 230), -1)
+    cv2.rectangle(crop, (10, 40), (110, 70), (20, 20, 20), 1)
+    cv2.putText(crop, text, (14, 63), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (10, 10, 10), 2)
+    return crop
+
+
+def test_lookups_are_scoped_to_the_track():
+    cache = PlateRecognitionCache()
+    crop = _plate_crop("1234567")
+    cache.put(1, cache.fingerprint(crop), "1234567", 0.9)
+
+    assert cache.get(2, cache.fingerprint(crop)) is None
+    assert cache.get(1, cache.fingerprint(crop)) == ("1234567", 0.9)
+    assert cache.stats()['hits'] == 1
+
+
+def test_near_duplicate_crop_of_same_track_hits():
+    cache = PlateRecognitionCache()
+    crop = _plate_crop("1234567")
+    cache.put(1, cache.fingerprint(crop), "1234567", 0.9)
+
+    brighter = cv2.convertScaleAbs(crop, alpha=1.1, beta=5)
+    assert cache.get(1, cache.fingerprint(brighter)) == ("1234567", 0.9)
@@ -0,0 +1,46 @@
+import threading
+import time
+from typing import Callable, Optional
+from utils.logger import get_logger
+
+
+class BackgroundLoader:
+    LOADING = "LOADING"
+    READY = "READY"
+    FAILED = "FAILED"
+
+    def __init__(self, name: str, load_fn: Callable[[], None]):
+        self.logger = get_logger(__name__)
+        self.name = name
+        self.load_fn = load_fn
+        self.state = self.LOADING
+        self.error: Optional[Exception] = None
+        self.load_time = 0.0
+        self.done = threading.Event()
+        self.thread = threading.Thread(target=self._run, name=f"load-{name}", daemon=True)
+
+    def start(self) -> 'BackgroundLoader':
+        self.thread.start()
+        return self
+
+    def _run(self):
+        start = time.perf_counter()
+        try:
+            self.load_fn()
+            self.state = self.READY
+            self.load_time = time.perf_counter() - start
+            self.logger.info(f"{self.name} ready in {self.load_time:.2f}s")
+        except Exception as e:
+            self.error = e
+            self.state = self.FAILED
+            self.logger.error(f"{self.name} failed to load: {e}", exc_info=True)
+        finally:
+            self.done.set()
+
+    @property
+    def ready(self) -> bool:
+        return self.state == self.READY
+
+    def wait(self, timeout: float = None) -> bool:
+        self.done.wait(timeout)
+        return self.ready
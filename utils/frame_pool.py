@@ -0,0 +1,100 @@
+import threading
+from collections import deque
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+import numpy as np
+from utils.logger import get_logger
+
+
+class FrameBuffer:
+    def __init__(self, pool: 'FramePool', index: int, array: np.ndarray):
+        self.pool = pool
+        self.index = index
+        self.array = array
+
+    def retain(self) -> 'FrameBuffer':
+        self.pool._retain(self.index)
+        return self
+
+    def release(self):
+        self.pool._release(self.index)
+
+
+# Reference counts live in the owning process; other processes map the same
+# slots with FramePool.attach() and address frames by slot index. Pools that no
+# other process reads use shared=False and stay in ordinary memory, since /dev/shm
+# is often small (64 MB in Docker) and overrunning it raises SIGBUS on write.
+class FramePool:
+    def __init__(self, shape: Tuple[int, ...], slots: int, dtype=np.uint8, name: str = None,
+                 create: bool = True, shared: bool = True):
+        self.logger = get_logger(__name__)
+        self.shape = tuple(shape)
+        self.slots = slots
+        self.dtype = np.dtype(dtype)
+        self.owner = create
+
+        if shared:
+            size = int(np.prod(self.shape)) * self.dtype.itemsize * slots
+            self.shm = shared_memory.SharedMemory(name=name, create=create, size=size)
+            self.arrays = np.ndarray((slots,) + self.shape, dtype=self.dtype, buffer=self.shm.buf)
+        else:
+            self.shm = None
+            self.arrays = np.empty((slots,) + self.shape, dtype=self.dtype)
+
+        self.lock = threading.Lock()
+        self.refcounts = [0] * slots
+        self.free_slots = deque(range(slots))
+
+    @property
+    def name(self) -> str:
+        if self.shm is None:
+            raise RuntimeError("Frame pool is not shared between processes")
+        return self.shm.name
+
+    @classmethod
+    def attach(cls, name: str, shape: Tuple[int, ...], slots: int, dtype=np.uint8) -> 'FramePool':
+        return cls(shape, slots, dtype=dtype, name=name, create=False)
+
+    def acquire(self) -> Optional[FrameBuffer]:
+        with self.lock:
+            if not self.free_slots:
+                return None
+            index = self.free_slots.popleft()
+            self.refcounts[index] = 1
+        return FrameBuffer(self, index, self.arrays[index])
+
+    def available(self) -> int:
+        with self.lock:
+            return len(self.free_slots)
+
+    def _retain(self, index: int):
+        with self.lock:
+            if self.refcounts[index] <= 0:
+                raise RuntimeError(f"Retain on released frame slot {index}")
+            self.refcounts[index] += 1
+
+    def _release(self, index: int):
+        with self.lock:
+            if self.refcounts[index] <= 0:
+                raise RuntimeError(f"Double release of frame slot {index}")
+            self.refcounts[index] -= 1
+            if self.refcounts[index] == 0:
+                self.free_slots.append(index)
+
+    def close(self):
+        if self.arrays is None:
+            return
+        self.arrays = None
+        if self.shm is None:
+            return
+        try:
+            self.shm.close()
+        except BufferError:
+            self.logger.warning("Frame pool closed while frames are still referenced")
+        if self.owner:
+            # unlinking only removes the name, so it is safe even if views are still alive
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+        self.shm = None